@@ -0,0 +1,3 @@
+# BlockTron device modules. code.py calls app.run(). Tools/build_mpy.py can
+# precompile them to .mpy so the device skips compiling them; OTA sends the
+# .py sources until the .mpy files are committed next to them.
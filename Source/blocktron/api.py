@@ -0,0 +1,191 @@
+# ------------------------- API Fetch / Parse ----------------------------------
+# Each endpoint has a circuit breaker. Failures never sleep, recurse or
+# reboot here: the caller gets None and asks the breaker when to try again,
+# and the display keeps its cached values in the meantime.
+import json
+import errno
+
+from blocktron import config
+from blocktron import cache
+from blocktron import net
+from blocktron import parse
+from blocktron import telemetry
+from blocktron import log
+from blocktron.retry import RetryPolicy, CircuitBreaker
+from blocktron.log import timed_print
+
+_metrics_parser = parse.MetricsParser()  # Reused buffers for every market data poll
+TELEMETRY_HEADER = "X-BlockTron-Telemetry"  # Carries telemetry.compact() on settings polls
+
+retry_policy = RetryPolicy()
+market_breaker = CircuitBreaker("market", retry_policy)
+ticker_breaker = CircuitBreaker("ticker", retry_policy)
+settings_breaker = CircuitBreaker("settings", retry_policy)
+
+
+def _allow(breaker):
+    """Breaker check that also counts requests sent after earlier failures as retries."""
+    if not breaker.allow():
+        return False
+    if breaker.failures:
+        telemetry.count(telemetry.RETRIES)
+    return True
+
+
+def _record_failure(breaker, counter, e):
+    telemetry.count(counter)
+    if getattr(e, "errno", None) == errno.EINPROGRESS:
+        log.warn(f"{breaker.name}: connect still in progress")
+    # device_max_failures_before_reboot now sets how many failures open the breaker
+    breaker.failure_threshold = config.device_max_failures_before_reboot
+    breaker.record_failure()
+
+
+def load_device_keys():
+    try:
+        with open(config.DEVICE_KEYS_FILE, "r") as f:
+            data = json.load(f)
+            config.device_id = data.get("deviceId", config.device_id)
+            config.device_api_key = data.get("apiKey", config.device_api_key)
+            timed_print(f"Loaded device_id: {config.device_id}")
+            timed_print(f"Loaded device_api_key: {config.device_api_key}")
+    except Exception as e:
+        log.warn(f"Error loading device keys: {e}")
+    config.settings_url = f"{config.api_current_settings_url}{config.device_id}"
+
+
+def fetch_cloud_settings():
+    """Fetch and apply the cloud settings; returns True if they are current (200 or 304)."""
+    settings_url = config.settings_url
+    if not _allow(settings_breaker):
+        return False
+    started = telemetry.start()
+    try:
+        log.event(log.SETTINGS_FETCH, settings_url)
+        headers = net.validators.headers(settings_url)
+        if config.conf_telemetry_push_enabled:
+            # Ride along with the settings poll so slow units show up fleet-wide
+            headers[TELEMETRY_HEADER] = telemetry.compact()
+        response = net.http.get(settings_url, headers=headers, timeout=10)
+        if net.validators.is_not_modified(response):
+            log.event(log.SETTINGS_UNCHANGED)
+        elif response.status_code == 200:
+            settings_json = response.json()
+
+            # Map JSON data to the shared settings with defaults if keys are missing
+            config.apply_cloud_settings(settings_json)
+            cache.put("settings", settings_json)
+
+            net.validators.store(settings_url, response)
+            log.event(log.SETTINGS_UPDATED)
+        else:
+            raise ValueError(f"status code {response.status_code}")
+        settings_breaker.record_success()
+        return True
+    except Exception as e:
+        log.warn(f"Error fetching cloud settings: {e}")
+        _record_failure(settings_breaker, telemetry.FAIL_SETTINGS, e)
+    finally:
+        telemetry.stop(telemetry.FETCH_SETTINGS, started)
+        try:
+            response.close()
+        except NameError:
+            pass
+    return False
+
+
+def fetch_data_from_api():
+    """Fetch main metrics, authenticating via device_id and api_key."""
+    if not _allow(market_breaker):
+        return None, None, None
+    started = telemetry.start()
+    try:
+        # Build JSON payload
+        body = json.dumps(
+            {
+                "device_id": config.device_id,
+                "device_key": config.device_api_key,
+            }
+        )
+        # POST over the pooled keep-alive session, with a timeout. The server
+        # may answer in the compact CSV format; JSON is still accepted.
+        response = net.http.post(
+            config.api_current_base_url,
+            data=body,
+            headers={"Content-Type": "application/json", "Accept": parse.ACCEPT_HEADER},
+            timeout=5,
+        )
+
+        # If server returns something other than HTTP 200, bail out early
+        if response.status_code != 200:
+            raise ValueError(f"Bad HTTP status {response.status_code}")
+
+        # Stream the three metrics out of the body without building it in RAM
+        parse_started = telemetry.start()
+        parsed = _metrics_parser.parse(response)
+        telemetry.stop(telemetry.PARSE_MARKET, parse_started)
+        if not parsed:
+            raise ValueError(f"Missing required metrics after {_metrics_parser.bytes_read} bytes")
+        values = _metrics_parser.values
+        market_breaker.record_success()
+        return values[parse.PRICE_SLOT], values[parse.BLOCKHEIGHT_SLOT], values[parse.MOSCOW_SLOT]
+    except Exception as e:  # Also adafruit_requests' OutOfRetries and RuntimeError on a cut-off response
+        log.warn("Market Data Err:", e)
+        _record_failure(market_breaker, telemetry.FAIL_MARKET, e)
+    finally:
+        telemetry.stop(telemetry.FETCH_MARKET, started)
+        try:
+            response.close()
+        except NameError:
+            pass
+    return None, None, None
+
+
+def fetch_ticker_data():
+    """Fetch scrolling ticker text, authenticating via device_id and api_key."""
+    if not _allow(ticker_breaker):
+        return None
+    started = telemetry.start()
+    try:
+        # Build the auth payload
+        body = json.dumps(
+            {
+                "device_id": config.device_id,
+                "device_key": config.device_api_key,
+            }
+        )
+
+        # 1) POST and check HTTP status. Unconditional: the auth travels in the
+        # body, and a server answers If-None-Match on a POST with 412, not 304.
+        response = net.http.post(
+            config.api_current_ticker_url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            timeout=10,
+        )
+        if response.status_code != 200:
+            raise ValueError(f"Bad ticker status {response.status_code}")
+
+        # 2) Extract and validate text
+        ticker_text = response.text.strip()
+        # Strip surrounding quotes if present
+        if ticker_text.startswith('"') and ticker_text.endswith('"'):
+            ticker_text = ticker_text.strip('"')
+        if not ticker_text:
+            raise ValueError("Ticker Data Empty")
+
+        ticker_breaker.record_success()
+        return ticker_text
+
+    except Exception as e:  # Also adafruit_requests' OutOfRetries and RuntimeError on a cut-off response
+        log.warn("Ticker Data Err:", e)
+        _record_failure(ticker_breaker, telemetry.FAIL_TICKER, e)
+
+    finally:
+        telemetry.stop(telemetry.FETCH_TICKER, started)
+        try:
+            response.close()
+        except NameError:
+            pass
+
+    return None
@@ -0,0 +1,484 @@
+# ------------------------- Application ----------------------------------------
+# The firmware code.py starts: hardware and display setup, the scheduled jobs
+# and the main loop. code.py only imports this module and calls run(), so a
+# cold boot compiles a few lines of code.py and loads the rest from the
+# package (precompiled, once .mpy files ship) instead of compiling it all.
+import time
+import gc
+import board
+import microcontroller
+import wifi
+from adafruit_matrixportal.matrixportal import MatrixPortal
+
+from blocktron import config
+from blocktron import net
+from blocktron import api
+from blocktron import ota
+from blocktron import display
+from blocktron import cache
+from blocktron import telemetry
+from blocktron import log
+from blocktron.cadence import MarketCadence
+from blocktron.clock import Clock
+from blocktron.link import Link
+from blocktron.live import LiveFeed, LIVE_POLL_INTERVAL
+from blocktron.log import timed_print
+from blocktron.scheduler import Scheduler, TASK_IDLE
+from blocktron.startup import Startup
+from blocktron.welcome import WelcomeScreen, WELCOME_CHECK_INTERVAL
+
+# ------------------------- Global Variables -----------------------------------
+last_displayed_btc_price = None
+last_displayed_block_height = None
+last_displayed_moscow_time = None
+ticker_message = None
+ticker_polled = False  # Set by the first ticker poll, which waits one refresh interval after boot
+
+# Set up by run()
+boot_started = None  # time.monotonic() at the top of code.py
+startup = None
+matrixportal = None
+screen = None
+ticker_scroller = None
+welcome = None
+wifi_link = None
+wall_clock = None
+live_feed = None
+scheduler = None
+
+
+def show_cached(key, index):
+    value = cache.value(key)
+    if value is not None:
+        screen.set_text(f"{value}", index)
+        screen.set_stale(index, True)
+        timed_print(f"Cache: showing {key}={value} fetched at {cache.fetched_at(key)}")
+    return value
+
+
+def show_cached_values():
+    global last_displayed_btc_price, last_displayed_block_height
+    global last_displayed_moscow_time, ticker_message
+    last_displayed_btc_price = show_cached("price", display.PRICE_TEXT_INDEX)
+    last_displayed_block_height = show_cached("height", display.BLOCKHEIGHT_TEXT_INDEX)
+    if config.conf_display_enable_moscow_time:
+        last_displayed_moscow_time = show_cached("moscow", display.MOSCOW_TEXT_INDEX)
+    ticker_message = cache.value("ticker")
+    if ticker_message:
+        screen.set_stale(display.TICKER_TEXT_INDEX, True)
+        ticker_scroller.set_message(ticker_message)
+
+
+def maybe_collect_garbage():
+    free_mem = gc.mem_free()
+    allocated = gc.mem_alloc()
+    total = free_mem + allocated
+    if total > 0:
+        free_percent = (free_mem / total) * 100.0
+        log.event(log.MEMORY_CHECK, free_mem, total)
+        if free_percent < config.FREE_MEMORY_THRESHOLD:
+            started = telemetry.start()
+            gc.collect()
+            telemetry.stop(telemetry.GC, started)
+            log.event(log.GC_DONE, gc.mem_free())
+
+
+# -----------------------------------------------------------------------------
+#                                 SCHEDULED JOBS
+# -----------------------------------------------------------------------------
+market_cadence = MarketCadence(("price", "block_height", "moscow_time"))
+
+
+def show_market(btc_price, block_height, moscow_time):
+    """Show freshly fetched or pushed market values."""
+    global last_displayed_btc_price, last_displayed_block_height, last_displayed_moscow_time
+    if config.conf_status_pixel_enabled:
+        display.flash_status_pixel(screen)
+    cache.put("price", btc_price)
+    cache.put("height", block_height)
+    cache.put("moscow", moscow_time)
+    screen.set_stale(display.PRICE_TEXT_INDEX, False)
+    screen.set_stale(display.BLOCKHEIGHT_TEXT_INDEX, False)
+    screen.set_stale(display.MOSCOW_TEXT_INDEX, False)
+    # Update display if the values have changed
+    if btc_price != last_displayed_btc_price:
+        screen.set_text(f"{btc_price}", display.PRICE_TEXT_INDEX)
+        last_displayed_btc_price = btc_price
+    if block_height != last_displayed_block_height:
+        screen.set_text(f"{block_height}", display.BLOCKHEIGHT_TEXT_INDEX)
+        last_displayed_block_height = block_height
+    if config.conf_display_enable_moscow_time:
+        if moscow_time != last_displayed_moscow_time:
+            screen.set_text(f"{moscow_time}", display.MOSCOW_TEXT_INDEX)
+            last_displayed_moscow_time = moscow_time
+    else:
+        screen.set_text("", display.MOSCOW_TEXT_INDEX)
+        last_displayed_moscow_time = None
+    log.event(log.MARKET_FETCHED, btc_price, block_height, moscow_time)
+
+
+def market_data_job(now):
+    if live_feed.subscribed:
+        return TASK_IDLE  # Values are pushed; live_job wakes this job if the feed drops
+    btc_price, block_height, moscow_time = api.fetch_data_from_api()
+    if (
+        btc_price is not None
+        and block_height is not None
+        and moscow_time is not None
+    ):
+        startup.record("market", now)
+        market_cadence.observe(
+            (btc_price, block_height, moscow_time),
+            now,
+            config.conf_api_btc_price_refresh_interval,
+            config.conf_api_market_max_refresh_interval,
+        )
+        show_market(btc_price, block_height, moscow_time)
+        return None
+    # Keep showing the last good values, dimmed as stale; show errors only
+    # when there is nothing to fall back on
+    if btc_price is None:
+        if last_displayed_btc_price is None:
+            screen.set_text("Price Err", display.PRICE_TEXT_INDEX)
+        screen.set_stale(display.PRICE_TEXT_INDEX, True)
+    if block_height is None:
+        if last_displayed_block_height is None:
+            screen.set_text("Blk Err", display.BLOCKHEIGHT_TEXT_INDEX)
+        screen.set_stale(display.BLOCKHEIGHT_TEXT_INDEX, True)
+    if moscow_time is None:
+        if last_displayed_moscow_time is None:
+            screen.set_text("Err", display.MOSCOW_TEXT_INDEX)
+        screen.set_stale(display.MOSCOW_TEXT_INDEX, True)
+    # Retry when the market breaker allows it rather than on the normal cadence
+    return max(api.market_breaker.retry_in(now), 1)
+
+
+def show_ticker(message):
+    """Take a freshly fetched or pushed ticker message; it scrolls on the next start()."""
+    global ticker_message
+    if config.conf_status_pixel_enabled:
+        display.flash_status_pixel(screen)
+    ticker_message = message
+    cache.put("ticker", ticker_message)
+    screen.set_stale(display.TICKER_TEXT_INDEX, False)
+    ticker_scroller.set_message(ticker_message)
+    log.event(log.TICKER_UPDATED, ticker_message)
+
+
+def scroll_ticker():
+    """Scroll the current ticker text once; every path that starts a scroll comes through here."""
+    ticker_scroller.start(time.monotonic())
+    if ticker_scroller.active:
+        # **Clear the time display before scrolling the ticker**
+        screen.set_text("", display.TIME_TEXT_INDEX)
+    screen.mark_dirty()
+    scheduler.wake("scroll")
+
+
+def ticker_job(now):
+    global ticker_message, ticker_polled
+    if not config.conf_display_ticker_enabled:
+        return None
+    if not ticker_polled:
+        # Read the interval now, after the first settings fetch has run, not at import
+        wait = boot_started + config.conf_api_ticker_refresh_interval - now
+        if wait > 0:
+            return wait
+        ticker_polled = True
+    if live_feed.subscribed and ticker_message:
+        # The text is pushed over the live feed; only scroll it again
+        ticker_scroller.set_message(ticker_message)
+        scroll_ticker()
+        return None
+    # Fetch and set the ticker message
+    new_ticker_message = api.fetch_ticker_data()
+    if new_ticker_message:
+        show_ticker(new_ticker_message)
+    else:
+        if ticker_message is None:
+            ticker_scroller.set_message("Ticker Err")
+        else:
+            timed_print("Keeping old ticker due to fetch error.")
+            screen.set_stale(display.TICKER_TEXT_INDEX, True)
+        ticker_message = None
+    scroll_ticker()
+    return None
+
+
+def scroll_job(now):
+    if not ticker_scroller.active:
+        return TASK_IDLE
+    screen.mark_dirty()
+    if ticker_scroller.step(now, config.conf_display_ticker_speed):
+        # **Re-display the time after scrolling**
+        show_clock(now, force=True)
+        return TASK_IDLE
+    return None
+
+
+def show_clock(now, force=False):
+    if ticker_scroller.active:
+        return  # The clock shares the ticker row; leave it blank while scrolling
+    if config.conf_display_enable_clock:
+        display.update_time_display(screen, wall_clock.hhmm(now), force)
+    elif display.current_time_display is not None:
+        # If disabling, clear the display once
+        display.clear_time_display(screen)
+
+
+def clock_job(now):
+    if not wall_clock.synced:
+        return TASK_IDLE  # ntp_job wakes the clock once the RTC is set
+    if now >= wall_clock.next_resync or wall_clock.utc_offset != config.conf_device_timezone_utc_offset:
+        wall_clock.resync(now)
+    show_clock(now, force=display.current_time_display is None)
+    if not config.conf_display_enable_clock:
+        return TASK_IDLE  # settings_job wakes the clock when it is turned back on
+    # Sleep until the displayed minute changes
+    return wall_clock.until_next_minute(now)
+
+
+def watched_settings():
+    return (
+        config.conf_device_timezone_utc_offset,
+        config.conf_display_enable_clock,
+        config.conf_live_broker,
+    )
+
+
+def apply_settings_changes(now, before):
+    """Act on settings that changed since watched_settings() returned before."""
+    if screen.apply_dim_level(config.conf_display_dim_level):
+        timed_print(f"Dim level set to {screen.dim_level}")
+    after = watched_settings()
+    if before[:2] != after[:2]:
+        wall_clock.resync(now)
+        show_clock(now, force=True)
+        scheduler.wake("clock")
+    if before[2] != after[2]:
+        scheduler.wake("live")
+
+
+def settings_job(now):
+    before = watched_settings()
+    wifi_link.sample()  # Fresh RSSI for the telemetry pushed with the poll
+    fetched = api.fetch_cloud_settings()
+    apply_settings_changes(now, before)
+    if fetched:
+        startup.record("settings", now)
+
+
+ntp_attempts = 0
+ntp_started = None
+
+
+def ntp_job(now):
+    global ntp_attempts, ntp_started
+    if ntp_started is None:
+        ntp_started = now
+    ntp_attempts += 1
+    if not net.sync_time(ntp_attempts, wifi_link.socket_pool):
+        wifi_link.addresses.forget(net.NTP_SERVER)
+        if ntp_attempts < net.NTP_ATTEMPTS:
+            return net.NTP_RETRY_DELAY
+        log.warn("All NTP sync attempts failed; continuing without accurate time")
+    wall_clock.resync()
+    startup.record("ntp", ntp_started)
+    scheduler.wake("clock")
+    return TASK_IDLE
+
+
+def on_live_ticker(message):
+    global ticker_message
+    if message == ticker_message:
+        return
+    if ticker_scroller.active:
+        # Don't swap the text mid-scroll; ticker_job scrolls the new text next
+        ticker_message = message
+        cache.put("ticker", message)
+        return
+    show_ticker(message)
+    scroll_ticker()
+
+
+def on_live_settings(settings_json):
+    before = watched_settings()
+    config.apply_cloud_settings(settings_json)
+    cache.put("settings", settings_json)
+    apply_settings_changes(time.monotonic(), before)
+
+
+def resume_polling():
+    """Wake the polling jobs that stood down while the live feed was subscribed."""
+    scheduler.wake("market")
+    scheduler.wake("ticker")
+
+
+def live_job(now):
+    was_subscribed = live_feed.subscribed
+    if not config.conf_live_broker:
+        live_feed.close()
+        if was_subscribed:
+            resume_polling()
+        return TASK_IDLE  # Woken by apply_settings_changes once a broker is configured
+    if live_feed.poll(now):
+        return None
+    if was_subscribed:
+        resume_polling()  # Fall back to polling straight away
+    return max(live_feed.breaker.retry_in(now), LIVE_POLL_INTERVAL)
+
+
+def welcome_job(now):
+    left = welcome.time_left(now, startup.ready_at is not None)
+    if left > 0:
+        return min(left, WELCOME_CHECK_INTERVAL)  # Look again soon; startup may finish first
+    welcome.close()
+    timed_print(f"Welcome screen closed; first data frame {(now - boot_started) * 1000:.0f}ms after boot")
+    return TASK_IDLE
+
+
+def cache_job(now):
+    cache.flush()
+
+
+def watchdog_job(now):
+    # Reboot only for a stuck network stack, never for API errors alone
+    if net.network_stuck(now):
+        log.warn("Network stack unresponsive; rebooting…")
+        cache.flush(force=True)
+        log.flush()
+        microcontroller.reset()
+
+
+def gc_job(now):
+    maybe_collect_garbage()
+    display.report_font_memory(matrixportal, ticker_scroller.message)
+    timed_print(f"Display refreshes so far: {screen.refreshes}")
+    timed_print(f"Market cadence: {market_cadence.describe()}")
+    scheduler.report()
+    telemetry.dump()
+
+
+def log_job(now):
+    log.drain()
+
+
+def ota_job(now):
+    if ota.OTA_ENABLED:
+        ota.check_for_update_and_stage()
+
+
+# -----------------------------------------------------------------------------
+#                                     STARTUP
+# -----------------------------------------------------------------------------
+def run(started):
+    """Set up the panel and network, then run the scheduled jobs until a reset.
+
+    started is time.monotonic() at the top of code.py.
+    """
+    global boot_started, startup, matrixportal, screen, ticker_scroller
+    global welcome, wifi_link, wall_clock, live_feed, scheduler
+    boot_started = started
+    # The network phases run as scheduler jobs; the breakdown prints once all three are done
+    startup = Startup(boot_started, awaited=("ntp", "settings", "market"))
+    startup.record("imports", boot_started)
+
+    log.print_previous()
+    gc.collect()
+    timed_print(f"Boot: imports done, {gc.mem_free()} bytes free")
+
+    # ------------------------- Hardware Setup ---------------------------------
+
+    # Create MatrixPortal object for handling display and network connection
+    phase_started = time.monotonic()
+    matrixportal = MatrixPortal(
+        status_neopixel=board.NEOPIXEL,
+        bit_depth=4,
+        width=64,
+        height=32,
+        color_order="RGB",
+        debug=False,
+    )
+    startup.record("matrixportal", phase_started)
+
+    # ------------------------- Display Setup ----------------------------------
+    # The first frame is painted from the last-known-good cache before any
+    # network work; cached values stay dimmed until fresh data replaces them.
+    phase_started = time.monotonic()
+    if cache.load():
+        cached_settings = cache.value("settings")
+        if cached_settings:
+            config.apply_cloud_settings(cached_settings)
+    startup.record("cache", phase_started)
+    phase_started = time.monotonic()
+    display.setup_labels(matrixportal)
+    screen = display.Screen(matrixportal)
+    ticker_scroller = display.TickerScroller(
+        matrixportal,
+        display.TICKER_FONT,
+        display.TICKER_POSITION,
+        display.dimmed_color(display.TICKER_TEXT_INDEX, screen.dim_level),
+    )
+    screen.scroller = ticker_scroller
+    startup.record("labels", phase_started)
+
+    # The welcome QR code goes up first and stays while the network comes up;
+    # the labels below are painted underneath it. Skipped while an OTA update
+    # is in flight (nvm[0] != 0), as boot.py used to.
+    phase_started = time.monotonic()
+    api.load_device_keys()
+    if microcontroller.nvm[0] == 0:
+        welcome = WelcomeScreen(screen, config.device_id, time.monotonic())
+    startup.record("welcome", phase_started)
+
+    phase_started = time.monotonic()
+    show_cached_values()
+    screen.mark_dirty()
+    screen.flush()
+    startup.record("first_frame", phase_started)
+    gc.collect()
+    timed_print(f"Boot: first frame, {gc.mem_free()} bytes free")
+
+    # ------------------------- Network Setup ----------------------------------
+    # NTP, the first settings fetch and the first market poll are scheduler
+    # jobs (ntp_job, settings_job, market_data_job) that start as soon as the
+    # loop does, so the welcome screen and ticker keep running between them.
+    # Reconnects rejoin the saved access point before falling back to
+    # MatrixPortal's scanning connect, and names resolve from saved addresses.
+    wifi_link = Link(wifi.radio, matrixportal.network.connect)
+    wifi_link.sample()
+    net.init(wifi.radio, connect=wifi_link.connect, link=wifi_link)
+    wall_clock = Clock()
+
+    # Call once early on successful startup to confirm new build, if any
+    ota.ota_mark_success()
+    ota.ota_download_stage_if_needed()
+
+    live_feed = LiveFeed(wifi.radio, show_market, on_live_ticker, on_live_settings)
+
+    # ------------------------- Main Loop --------------------------------------
+    scheduler = Scheduler(after_run=screen.flush)
+    # Startup jobs first: tasks due at the same time run in the order they were added
+    scheduler.add("settings", settings_job, lambda: config.api_settings_refresh_interval)
+    scheduler.add("ntp", ntp_job, lambda: net.NTP_RETRY_DELAY)
+    scheduler.add(
+        "market", market_data_job,
+        lambda: market_cadence.interval(config.conf_api_btc_price_refresh_interval),
+        deadline=10,
+    )
+    scheduler.add("ticker", ticker_job, lambda: config.conf_api_ticker_refresh_interval)
+    scheduler.add("scroll", scroll_job, lambda: config.conf_display_ticker_speed, deadline=0.1)
+    scheduler.add("clock", clock_job, lambda: 60, deadline=1)
+    scheduler.add("cache", cache_job, lambda: 60, initial_delay=60)
+    scheduler.add("watchdog", watchdog_job, lambda: 60, initial_delay=60)
+    scheduler.add("gc", gc_job, lambda: config.GC_CHECK_INTERVAL, initial_delay=config.GC_CHECK_INTERVAL)
+    scheduler.add("ota", ota_job, lambda: ota.OTA_CHECK_INTERVAL, initial_delay=ota.OTA_CHECK_INTERVAL)
+    scheduler.add("log", log_job, lambda: config.LOG_DRAIN_INTERVAL)
+    scheduler.add("live", live_job, lambda: LIVE_POLL_INTERVAL)
+    if welcome is not None:
+        scheduler.add("welcome", welcome_job, lambda: WELCOME_CHECK_INTERVAL)
+    try:
+        scheduler.run()
+    except Exception:
+        log.flush()  # Keep the events leading up to the crash for the next boot
+        raise
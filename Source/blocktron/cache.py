@@ -0,0 +1,95 @@
+# ------------------------- Last-Known-Good Cache ------------------------------
+# The last good price, block height, Moscow time, ticker text and cloud
+# settings, each with the time it was fetched, kept in microcontroller.nvm so
+# the first frame after a reset can be painted before the network is up.
+#
+# NVM lives in flash, so writes are wear-aware: entries only count as changed
+# when their value differs, and a changed cache is written at most once per
+# CACHE_MIN_WRITE_INTERVAL unless a reset is about to happen.
+import json
+import time
+import struct
+import binascii
+import microcontroller
+
+from blocktron.log import timed_print
+
+CACHE_NVM_OFFSET = 16  # nvm[0..15] are reserved for the OTA state bytes
+CACHE_NVM_END = 5888  # The welcome QR code (blocktron/welcome.py), then the persisted log, follow the cache
+CACHE_MIN_WRITE_INTERVAL = 600  # Seconds between NVM writes
+_HEADER = "<4sHI"  # magic, payload length, CRC32 of the payload
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_MAGIC = b"BTC1"
+
+_entries = {}  # key -> [value, time.time() when it was fetched]
+_pending = False
+_last_write = None
+
+
+def load():
+    """Read the cache from NVM; a missing or corrupt record leaves it empty."""
+    global _entries, _last_write
+    _last_write = time.monotonic()  # Hold the first write back a full interval after boot
+    nvm = microcontroller.nvm
+    try:
+        magic, length, crc = struct.unpack(
+            _HEADER, nvm[CACHE_NVM_OFFSET:CACHE_NVM_OFFSET + _HEADER_SIZE]
+        )
+        if magic != _MAGIC:
+            timed_print("Cache: empty")
+            return False
+        start = CACHE_NVM_OFFSET + _HEADER_SIZE
+        payload = bytes(nvm[start:start + length])
+        if binascii.crc32(payload) != crc:
+            timed_print("Cache: CRC mismatch, ignoring")
+            return False
+        _entries = json.loads(payload)
+    except (ValueError, TypeError) as e:
+        timed_print(f"Cache: unreadable ({e})")
+        return False
+    timed_print(f"Cache: restored {', '.join(_entries)}")
+    return True
+
+
+def value(key):
+    entry = _entries.get(key)
+    return None if entry is None else entry[0]
+
+
+def fetched_at(key):
+    entry = _entries.get(key)
+    return None if entry is None else entry[1]
+
+
+def put(key, new_value):
+    """Record a freshly fetched value; only a changed value marks the cache dirty."""
+    global _pending
+    entry = _entries.get(key)
+    if entry is not None and entry[0] == new_value:
+        entry[1] = time.time()
+        return
+    _entries[key] = [new_value, time.time()]
+    _pending = True
+
+
+def flush(force=False):
+    """Write pending changes to NVM, at most once per CACHE_MIN_WRITE_INTERVAL unless forced."""
+    global _pending, _last_write
+    if not _pending:
+        return False
+    now = time.monotonic()
+    if not force and _last_write is not None and now - _last_write < CACHE_MIN_WRITE_INTERVAL:
+        return False
+    payload = json.dumps(_entries).encode()
+    end = CACHE_NVM_OFFSET + _HEADER_SIZE + len(payload)
+    if end > CACHE_NVM_END:
+        timed_print(f"Cache: {len(payload)} bytes does not fit in NVM, not written")
+        _pending = False
+        return False
+    microcontroller.nvm[CACHE_NVM_OFFSET:end] = (
+        struct.pack(_HEADER, _MAGIC, len(payload), binascii.crc32(payload)) + payload
+    )
+    _pending = False
+    _last_write = now
+    timed_print(f"Cache: wrote {len(payload)} bytes to NVM")
+    return True
@@ -0,0 +1,62 @@
+# ------------------------- Adaptive Cadence -----------------------------------
+# Poll intervals that follow how often each metric actually changes. A change
+# sets a metric's interval to half the time since its previous change; each
+# flat poll backs it off toward the maximum. All three metrics come from
+# the same live_data endpoint, so the market poll runs at the shortest of
+# their intervals: it slows down only when every metric is flat.
+
+BACK_OFF_FACTOR = 1.5  # Interval multiplier after a flat poll
+
+
+class MetricCadence:
+    """Fetch interval for one metric, bounded by min_interval and max_interval."""
+
+    def __init__(self, name):
+        self.name = name
+        self.interval = None  # Seconds; None until the first bounds are applied
+        self.changes = 0
+        self.flat_polls = 0
+        self._value = None
+        self._changed_at = None
+
+    def observe(self, value, now, min_interval, max_interval):
+        if self.interval is None:
+            self.interval = min_interval
+        if value != self._value:
+            if self._value is not None:
+                # Poll about twice per observed change period
+                self.changes += 1
+                self.interval = (now - self._changed_at) / 2
+            self._value = value
+            self._changed_at = now
+            self.flat_polls = 0
+        else:
+            self.flat_polls += 1
+            self.interval *= BACK_OFF_FACTOR
+        self.interval = max(min_interval, min(self.interval, max_interval))
+
+
+class MarketCadence:
+    """Combined poll interval for the metrics behind one endpoint."""
+
+    def __init__(self, names):
+        self.metrics = [MetricCadence(name) for name in names]
+
+    def observe(self, values, now, min_interval, max_interval):
+        """Feed one poll's values, in the order of names."""
+        if max_interval < min_interval:
+            max_interval = min_interval
+        for metric, value in zip(self.metrics, values):
+            metric.observe(value, now, min_interval, max_interval)
+
+    def interval(self, default):
+        """Seconds until the next poll; default until the first observation."""
+        intervals = [m.interval for m in self.metrics if m.interval is not None]
+        return min(intervals) if intervals else default
+
+    def describe(self):
+        return ", ".join(
+            f"{m.name}={m.interval if m.interval is None else round(m.interval, 1)}s"
+            f" ({m.changes} changes, {m.flat_polls} flat)"
+            for m in self.metrics
+        )
@@ -0,0 +1,62 @@
+# ------------------------- Wall Clock -----------------------------------------
+# The local time of day, kept on the monotonic clock so the clock row can be
+# redrawn exactly at each minute boundary without reading the RTC or doing
+# time zone arithmetic on every check.
+import time
+
+from blocktron import config
+from blocktron.log import timed_print
+
+DAY_SECONDS = 86400
+CLOCK_RESYNC_INTERVAL = 3600  # Seconds between drift checks against the RTC
+MINUTE_FLIP_MARGIN = 0.05  # Redraw this long after the boundary so the new minute is certain
+
+
+class Clock:
+    """Local seconds-of-day anchored to time.monotonic().
+
+    resync() reads the RTC and the UTC offset once; after that the time of day
+    is the anchor plus elapsed monotonic time. The RTC only has whole-second
+    resolution, so later resyncs keep the anchor unless the two clocks have
+    drifted apart by a second or more.
+    """
+
+    def __init__(self):
+        self._anchor_mono = None  # time.monotonic() at the anchor
+        self._anchor_day_seconds = 0.0  # Local seconds since midnight at the anchor
+        self.utc_offset = None  # Hours, as applied at the last resync
+        self.next_resync = 0.0
+        self.resyncs = 0
+
+    @property
+    def synced(self):
+        return self._anchor_mono is not None
+
+    def resync(self, now=None):
+        """Re-anchor to the RTC (after NTP sync or an offset change); returns True if it moved."""
+        if now is None:
+            now = time.monotonic()
+        offset = config.conf_device_timezone_utc_offset
+        rtc_day_seconds = (time.time() + offset * 3600) % DAY_SECONDS
+        self.next_resync = now + CLOCK_RESYNC_INTERVAL
+        if self.synced and offset == self.utc_offset:
+            drift = (rtc_day_seconds - self.day_seconds(now) + DAY_SECONDS / 2) % DAY_SECONDS - DAY_SECONDS / 2
+            if -1 < drift < 1:
+                return False
+            timed_print(f"Clock: {drift:+.0f}s drift from the RTC; re-anchoring")
+        self._anchor_mono = now
+        self._anchor_day_seconds = rtc_day_seconds
+        self.utc_offset = offset
+        self.resyncs += 1
+        return True
+
+    def day_seconds(self, now):
+        return (self._anchor_day_seconds + now - self._anchor_mono) % DAY_SECONDS
+
+    def hhmm(self, now):
+        minutes = int(self.day_seconds(now)) // 60
+        return f"{minutes // 60:02d}{minutes % 60:02d}"
+
+    def until_next_minute(self, now):
+        """Seconds from now until just after the next minute boundary."""
+        return 60 - self.day_seconds(now) % 60 + MINUTE_FLIP_MARGIN
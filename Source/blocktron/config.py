@@ -0,0 +1,132 @@
+# ----------------- Constants & Local Device Configuration ----------------------
+# Shared settings for the blocktron modules. Cloud-tunable values live here as
+# module attributes so every module reads the current value at call time.
+
+DEVICE_KEYS_FILE = "/device_keys.json"
+
+FREE_MEMORY_THRESHOLD = 90.0  # Below % free memory threshold, run garbage collection
+GC_CHECK_INTERVAL = 300  # Garbage collection check interval in seconds
+DEVICE_LOGGING_ENABLED = True  # Serial USB Console Printing enabled
+LOG_DRAIN_INTERVAL = 1  # Seconds between printing buffered log records to serial
+
+api_current_base_url = "https://api.blocktron.io/api:2Pxae5kP/live_data_new"
+api_current_ticker_url = "https://api.blocktron.io/api:2Pxae5kP/live_data_ticker_new"
+api_current_settings_url = "https://api.blocktron.io/api:2Pxae5kP/device/get_settings/"
+
+# Initialize device_id and api_key with default or empty values
+device_id = "UNKNOWN_DEVICE"
+device_api_key = "UNKNOWN_KEY"
+settings_url = f"{api_current_settings_url}{device_id}"
+
+# Default configuration values
+conf_device_timezone_utc_offset = -5
+conf_api_btc_price_refresh_interval = 30  # Fastest market poll, used while values move
+conf_api_market_max_refresh_interval = 300  # Slowest market poll, reached while values stay flat
+conf_api_ticker_refresh_interval = 120
+api_settings_refresh_interval = 180
+device_max_failures_before_reboot = 3
+conf_display_ticker_speed = 0.03
+conf_device_boot_text_top = ""
+conf_device_boot_text_bottom = "BlockTron"
+conf_display_enable_moscow_time = True
+conf_display_ticker_enabled = True
+conf_status_pixel_enabled = True
+conf_display_enable_clock = True
+conf_display_update_pixel_duration = 0.01
+device_button_check_interval = 0.1
+conf_display_dim_level = 10  # 1..10, applied live by swapping palette colors
+conf_device_log_level = 1  # Lowest level logged: 0 debug, 1 info, 2 warn, 3 error
+conf_live_broker = ""  # MQTT host for pushed updates; empty keeps the device on polling
+conf_live_port = 8883
+conf_telemetry_push_enabled = True  # Send telemetry.compact() along with each settings poll
+
+
+def apply_cloud_settings(settings_json):
+    """Map the get_settings JSON onto the module settings, keeping defaults for missing keys."""
+    global conf_device_timezone_utc_offset
+    global conf_api_btc_price_refresh_interval
+    global conf_api_market_max_refresh_interval
+    global conf_api_ticker_refresh_interval
+    global api_settings_refresh_interval
+    global device_max_failures_before_reboot
+    global conf_display_ticker_speed
+    global conf_device_boot_text_top
+    global conf_device_boot_text_bottom
+    global conf_display_enable_moscow_time
+    global conf_display_ticker_enabled
+    global conf_status_pixel_enabled
+    global conf_display_enable_clock
+    global conf_display_update_pixel_duration
+    global device_button_check_interval
+    global conf_display_dim_level
+    global conf_device_log_level
+    global conf_live_broker
+    global conf_live_port
+    global conf_telemetry_push_enabled
+
+    conf_device_timezone_utc_offset = settings_json.get(
+        "conf_device_timezone_utc_offset", conf_device_timezone_utc_offset
+    )
+    conf_api_btc_price_refresh_interval = settings_json.get(
+        "conf_api_btc_price_refresh_interval",
+        conf_api_btc_price_refresh_interval,
+    )
+    conf_api_market_max_refresh_interval = settings_json.get(
+        "conf_api_market_max_refresh_interval",
+        conf_api_market_max_refresh_interval,
+    )
+    conf_api_ticker_refresh_interval = settings_json.get(
+        "conf_api_ticker_refresh_interval", conf_api_ticker_refresh_interval
+    )
+    api_settings_refresh_interval = settings_json.get(
+        "api_settings_refresh_interval", api_settings_refresh_interval
+    )
+    device_max_failures_before_reboot = settings_json.get(
+        "device_max_failures_before_reboot", device_max_failures_before_reboot
+    )
+    conf_display_ticker_speed = settings_json.get(
+        "conf_display_ticker_speed", conf_display_ticker_speed
+    )
+    conf_device_boot_text_top = str(
+        settings_json.get(
+            "conf_device_boot_text_top", conf_device_boot_text_top
+        )
+    )
+    conf_device_boot_text_bottom = str(
+        settings_json.get(
+            "conf_device_boot_text_bottom", conf_device_boot_text_bottom
+        )
+    )
+    conf_display_enable_moscow_time = settings_json.get(
+        "conf_display_enable_moscow_time", conf_display_enable_moscow_time
+    )
+    conf_display_ticker_enabled = settings_json.get(
+        "conf_display_ticker_enabled", conf_display_ticker_enabled
+    )
+    conf_display_enable_clock = settings_json.get(
+        "conf_display_enable_clock", conf_display_enable_clock
+    )
+    conf_status_pixel_enabled = settings_json.get(
+        "conf_status_pixel_enabled", conf_status_pixel_enabled
+    )
+    conf_display_update_pixel_duration = settings_json.get(
+        "conf_display_update_pixel_duration", conf_display_update_pixel_duration
+    )
+    device_button_check_interval = settings_json.get(
+        "device_button_check_interval", device_button_check_interval
+    )
+    conf_display_dim_level = settings_json.get(
+        "conf_display_dim_level", conf_display_dim_level
+    )
+    conf_device_log_level = settings_json.get(
+        "conf_device_log_level", conf_device_log_level
+    )
+    conf_live_broker = settings_json.get(
+        "conf_live_broker", conf_live_broker
+    )
+    conf_live_port = settings_json.get(
+        "conf_live_port", conf_live_port
+    )
+    conf_telemetry_push_enabled = settings_json.get(
+        "conf_telemetry_push_enabled", conf_telemetry_push_enabled
+    )
@@ -0,0 +1,439 @@
+# ------------------------- Display ------------------------------------------
+import gc
+import time
+import array
+import displayio
+import bitmaptools
+
+from blocktron import config
+from blocktron import fonts
+from blocktron import telemetry
+from blocktron import log
+
+# Text indices, hard-coded to regions of the screen
+PRICE_TEXT_INDEX = 0
+BLOCKHEIGHT_TEXT_INDEX = 1
+MOSCOW_TEXT_INDEX = 2
+STATUS_PIXEL_INDEX = 3
+TICKER_TEXT_INDEX = 4
+TIME_TEXT_INDEX = 5
+
+# Colors
+PRICE_COLOR = 0xFF4500
+BLOCKHEIGHT_COLOR = 0x00FFFF
+MOSCOW_COLOR = 0xFFFFFF
+STATUS_PIXEL_COLOR = 0x00FF00
+TICKER_COLOR = 0x6A0DAD
+TIME_COLOR = 0x6A0DAD
+
+# ------------------------- Dim Levels -----------------------------------------
+GLOBAL_DIM_LEVEL = 10  # Default brightness 1..10; the cloud's conf_display_dim_level overrides it
+
+# Every display color at dim levels 1..10, indexed [text index][level - 1].
+# Each channel is scaled by level / 10 and kept at 1 or above if it was lit.
+DIM_COLORS = (
+    (  # PRICE_COLOR
+        0x190600, 0x330D00, 0x4C1400, 0x661B00, 0x7F2200,
+        0x992900, 0xB23000, 0xCC3700, 0xE53E00, 0xFF4500,
+    ),
+    (  # BLOCKHEIGHT_COLOR
+        0x001919, 0x003333, 0x004C4C, 0x006666, 0x007F7F,
+        0x009999, 0x00B2B2, 0x00CCCC, 0x00E5E5, 0x00FFFF,
+    ),
+    (  # MOSCOW_COLOR
+        0x191919, 0x333333, 0x4C4C4C, 0x666666, 0x7F7F7F,
+        0x999999, 0xB2B2B2, 0xCCCCCC, 0xE5E5E5, 0xFFFFFF,
+    ),
+    (  # STATUS_PIXEL_COLOR
+        0x001900, 0x003300, 0x004C00, 0x006600, 0x007F00,
+        0x009900, 0x00B200, 0x00CC00, 0x00E500, 0x00FF00,
+    ),
+    (  # TICKER_COLOR
+        0x0A0111, 0x150222, 0x1F0333, 0x2A0545, 0x350656,
+        0x3F0767, 0x4A0979, 0x540A8A, 0x5F0B9B, 0x6A0DAD,
+    ),
+    (  # TIME_COLOR
+        0x0A0111, 0x150222, 0x1F0333, 0x2A0545, 0x350656,
+        0x3F0767, 0x4A0979, 0x540A8A, 0x5F0B9B, 0x6A0DAD,
+    ),
+)
+
+
+STALE_DIM_DROP = 6  # Levels cached values are dimmed by until fresh data replaces them
+
+
+def clamp_dim_level(level):
+    try:
+        return max(1, min(int(level), 10))
+    except (TypeError, ValueError):
+        return GLOBAL_DIM_LEVEL
+
+
+def dimmed_color(index, level):
+    """Color for a text index at a dim level, looked up instead of computed."""
+    return DIM_COLORS[index][clamp_dim_level(level) - 1]
+
+
+# Fonts, loaded from their compact .btf caches when present
+FONT_LARGE = "/fonts/Arial-Bold-12.bdf"
+FONT_MEDIUM = "/fonts/5x8-lean.bdf"
+FONT_SMALL = "/fonts/4x6-lean.bdf"
+
+# (name, font) for each text index, in index order
+LABEL_FONTS = (
+    ("price", FONT_LARGE),
+    ("block", FONT_MEDIUM),
+    ("moscow", FONT_MEDIUM),
+    ("status", FONT_SMALL),
+    ("ticker", FONT_MEDIUM),
+    ("time", FONT_MEDIUM),
+)
+
+current_time_display = "0000"  # Initialize with a default value
+
+
+# ------------------------- MatrixPortal Internals -----------------------------
+# MatrixPortal has no public API for recoloring a text region in place or for
+# handing it preloaded fonts. Both go through PortalBase's private _text list
+# (dicts with "label" and "color") and _fonts dict (keyed by font path), as
+# they are in adafruit_portalbase 3.x (checked against 3.5.2). Every access is
+# in these two helpers, so a library change only needs fixing here.
+def text_entry(portal, index):
+    """PortalBase's record for text region index: "label" (None until set) and "color"."""
+    return portal._text[index]
+
+
+def seed_font(portal, path, font):
+    """Make add_text(text_font=path) use font instead of loading path itself."""
+    portal._fonts[path] = font
+
+
+# ------------------------- Display Setup --------------------------------------
+def setup_labels(portal):
+    """Create the six text regions; their order must match the *_TEXT_INDEX constants."""
+    # MatrixPortal caches fonts by path; seed that cache so its labels use the
+    # lazily loaded .btf fonts instead of parsing the BDF files
+    for path in (FONT_LARGE, FONT_MEDIUM, FONT_SMALL):
+        seed_font(portal, path, fonts.load_font(path))
+
+    portal.add_text(
+        text_position=(2, -6),
+        text_color=dimmed_color(PRICE_TEXT_INDEX, config.conf_display_dim_level),
+        text_scale=1,
+        is_data=True,
+        text_font=FONT_LARGE,
+        text=config.conf_device_boot_text_top,
+    )
+
+    portal.add_text(
+        text_position=(2, 25),
+        text_color=dimmed_color(BLOCKHEIGHT_TEXT_INDEX, config.conf_display_dim_level),
+        text_scale=1,
+        is_data=True,
+        text_font=FONT_MEDIUM,
+        text=config.conf_device_boot_text_bottom,
+    )
+
+    portal.add_text(
+        text_position=(43, 25),
+        text_color=dimmed_color(MOSCOW_TEXT_INDEX, config.conf_display_dim_level),
+        text_scale=1,
+        is_data=True,
+        text_font=FONT_MEDIUM,
+        text="",
+    )
+
+    portal.add_text(
+        text_position=(60, -2),
+        text_color=dimmed_color(STATUS_PIXEL_INDEX, config.conf_display_dim_level),
+        text_scale=1,
+        is_data=True,
+        text_font=FONT_SMALL,
+        text="",
+    )
+
+    # Placeholder keeping the text indices stable; the ticker itself is drawn by TickerScroller
+    portal.add_text(
+        text_position=(0, 18),
+        text_color=dimmed_color(TICKER_TEXT_INDEX, config.conf_display_dim_level),
+        text_scale=1,
+        is_data=True,
+        text_font=FONT_MEDIUM,
+        text="",
+    )
+
+    portal.add_text(
+        text_position=(43, 17),
+        text_color=dimmed_color(TIME_TEXT_INDEX, config.conf_display_dim_level),
+        text_scale=1,
+        is_data=True,
+        text_font=FONT_MEDIUM,
+        text="",
+    )
+
+
+# ------------------------- Batched Refresh ------------------------------------
+class Screen:
+    """Batches label changes into at most one panel refresh per scheduler tick.
+
+    Auto-refresh is turned off; set_text skips unchanged text and marks the
+    screen dirty, and flush() pushes a single refresh in which displayio
+    recomposes only the changed areas.
+    """
+
+    def __init__(self, portal, label_count=len(LABEL_FONTS)):
+        self.portal = portal
+        self._display = portal.graphics.display
+        self._display.auto_refresh = False
+        self._texts = [None] * label_count
+        self._stale = [False] * label_count
+        self.dim_level = clamp_dim_level(config.conf_display_dim_level)
+        self.scroller = None  # TickerScroller drawing the ticker row, if any
+        self.dirty = False
+        self.refreshes = 0
+
+    def _apply_color(self, index):
+        level = self.dim_level
+        if self._stale[index]:
+            level = max(1, level - STALE_DIM_DROP)
+        color = dimmed_color(index, level)
+        entry = text_entry(self.portal, index)
+        entry["color"] = color  # used if MatrixPortal ever recreates the label
+        if entry["label"] is not None:
+            entry["label"].color = color
+        if index == TICKER_TEXT_INDEX and self.scroller is not None:
+            self.scroller.set_color(color)
+        self.dirty = True
+
+    def apply_dim_level(self, level):
+        """Swap every label's palette color in place; returns True if anything changed."""
+        level = clamp_dim_level(level)
+        if level == self.dim_level:
+            return False
+        self.dim_level = level
+        for index in range(len(self._texts)):
+            self._apply_color(index)
+        return True
+
+    def set_stale(self, index, stale):
+        """Dim a label showing cached data, or restore it once fresh data arrives."""
+        if self._stale[index] == stale:
+            return
+        self._stale[index] = stale
+        self._apply_color(index)
+
+    def set_text(self, text, index):
+        if self._texts[index] == text:
+            return
+        self._texts[index] = text
+        started = telemetry.start()
+        self.portal.set_text(text, index)
+        telemetry.stop(telemetry.SET_TEXT, started)
+        self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def flush(self):
+        if not self.dirty:
+            return
+        started = telemetry.start()
+        self._display.refresh()
+        telemetry.stop(telemetry.REFRESH, started)
+        self.dirty = False
+        self.refreshes += 1
+
+
+def flash_status_pixel(screen):
+    screen.set_text(".", STATUS_PIXEL_INDEX)
+    screen.flush()  # the dot has to reach the panel before it is cleared
+    time.sleep(config.conf_display_update_pixel_duration)
+    screen.set_text("", STATUS_PIXEL_INDEX)
+
+
+def update_time_display(screen, formatted_time, force=False):
+    """Show formatted_time (HHMM from clock.Clock) in the clock row if it changed or force is set."""
+    global current_time_display
+    if force or (formatted_time != current_time_display):
+        current_time_display = formatted_time
+        screen.set_text(formatted_time, TIME_TEXT_INDEX)
+        log.event(log.TIME_UPDATED, formatted_time)
+
+
+def report_font_memory(portal, ticker_text):
+    labels = []
+    for index, (name, path) in enumerate(LABEL_FONTS):
+        label = text_entry(portal, index)["label"]
+        text = ticker_text if index == TICKER_TEXT_INDEX else (label.text if label else "")
+        labels.append((name, path, text))
+    fonts.report_memory(labels)
+
+
+def clear_time_display(screen):
+    global current_time_display
+    screen.set_text("", TIME_TEXT_INDEX)
+    current_time_display = None
+
+
+# ------------------------- Ticker Scroller ------------------------------------
+TICKER_FONT = FONT_MEDIUM
+TICKER_POSITION = (0, 18)  # Same origin the ticker label used
+TICKER_CHUNK_WIDTH = 64  # Pixels scrolled before a windowed message is re-rendered
+TICKER_MAX_BITMAP_WIDTH = 512  # Messages narrower than this are rendered once, whole
+MAX_SCROLL_STEP_PX = 8  # Cap per-tick catch-up so a slow fetch doesn't make the ticker jump
+
+
+class TickerScroller:
+    """Cooperative, prerendered replacement for matrixportal.scroll_text.
+
+    The message is rendered once into a 1-bit displayio.Bitmap and scrolled by
+    moving its TileGrid, so a frame costs the same regardless of message
+    length. Messages wider than TICKER_MAX_BITMAP_WIDTH are rendered in
+    windows of display width + TICKER_CHUNK_WIDTH into two buffers that are
+    swapped under the TileGrid, so a re-render never shows a half-drawn strip.
+    """
+
+    def __init__(self, portal, font_path, position, color):
+        self._display_width = portal.graphics.display.width
+        self._font = fonts.load_font(font_path)
+        width, height, _, y_off = self._font.get_bounding_box()
+        self._ascent = height + y_off
+        self._height = height
+        self._palette = displayio.Palette(2)
+        self._palette.make_transparent(0)
+        self._palette[1] = color
+        self._buffers = ()
+        self._tile_grid = None
+        self._group = displayio.Group(x=0, y=position[1] + self._ascent // 2 - self._ascent)
+        portal.splash.append(self._group)
+        self._message = ""
+        self._offsets = array.array("h")
+        self._text_width = 0
+        self._window_start = 0
+        self._window_width = 0
+        self._x = 0
+        self._last_step = 0.0
+        self.active = False
+
+    def set_message(self, message):
+        """Lay out and render a new message; only called when the text changes."""
+        if message == self._message:
+            return
+        self._message = message
+        self._font.load_glyphs(message)
+        offsets = array.array("h", [0] * (len(message) + 1))
+        cursor = 0
+        for i, ch in enumerate(message):
+            offsets[i] = cursor
+            glyph = self._font.get_glyph(ord(ch))
+            if glyph is not None:
+                cursor += glyph.shift_x
+        offsets[len(message)] = cursor
+        self._offsets = offsets
+        self._text_width = cursor
+
+        if cursor <= TICKER_MAX_BITMAP_WIDTH:
+            window_width = max(cursor, 1)
+        else:
+            window_width = self._display_width + TICKER_CHUNK_WIDTH
+        if window_width != self._window_width or not self._buffers:
+            # Drop the old strips before allocating new ones to keep the peak low
+            if self._tile_grid is not None:
+                self._group.remove(self._tile_grid)
+            self._tile_grid = None
+            self._buffers = ()
+            gc.collect()
+            self._buffers = (
+                displayio.Bitmap(window_width, self._height, 2),
+                displayio.Bitmap(window_width, self._height, 2),
+            )
+            self._tile_grid = displayio.TileGrid(
+                self._buffers[0], pixel_shader=self._palette, x=self._display_width
+            )
+            self._group.append(self._tile_grid)
+            self._window_width = window_width
+        self._render_window(0)
+
+    def _render_window(self, window_start):
+        """Draw the glyphs overlapping [window_start, window_start + width) into the back buffer."""
+        front = self._tile_grid.bitmap
+        back = self._buffers[1] if front is self._buffers[0] else self._buffers[0]
+        back.fill(0)
+        window_end = window_start + self._window_width
+        font = self._font
+        offsets = self._offsets
+        for i, ch in enumerate(self._message):
+            if offsets[i + 1] < window_start:
+                continue
+            if offsets[i] >= window_end:
+                break
+            glyph = font.get_glyph(ord(ch))
+            if glyph is None or glyph.width == 0:
+                continue
+            left = offsets[i] + glyph.dx - window_start
+            top = self._ascent - glyph.height - glyph.dy
+            src_x1 = glyph.tile_index * glyph.width
+            src_x2 = src_x1 + glyph.width
+            src_y1 = 0
+            if left < 0:
+                src_x1 -= left
+                left = 0
+            if left + (src_x2 - src_x1) > self._window_width:
+                src_x2 = src_x1 + self._window_width - left
+            if top < 0:
+                src_y1 = -top
+                top = 0
+            if src_x2 <= src_x1 or src_y1 >= glyph.height:
+                continue
+            bitmaptools.blit(
+                back, glyph.bitmap, left, top,
+                x1=src_x1, y1=src_y1, x2=src_x2, y2=glyph.height,
+                skip_source_index=0,
+            )
+        self._window_start = window_start
+        self._tile_grid.bitmap = back
+        self._tile_grid.x = self._x + window_start
+
+    def set_color(self, color):
+        self._palette[1] = color
+
+    @property
+    def message(self):
+        return self._message
+
+    def start(self, now):
+        if self._tile_grid is None or not self._message:
+            self.active = False
+            return
+        self._x = self._display_width
+        if self._window_start != 0:
+            self._render_window(0)
+        self._tile_grid.x = self._x
+        self._last_step = now
+        self.active = True
+
+    def step(self, now, frame_delay):
+        """Advance the strip; returns True on the pass the message leaves the screen."""
+        if not self.active:
+            return False
+        pixels = int((now - self._last_step) / frame_delay) if frame_delay > 0 else 1
+        if pixels <= 0:
+            return False
+        if pixels > MAX_SCROLL_STEP_PX:
+            pixels = MAX_SCROLL_STEP_PX
+            self._last_step = now
+        else:
+            self._last_step += pixels * frame_delay
+        self._x -= pixels
+        if self._x < -self._text_width - 1:
+            self.active = False
+            self._tile_grid.x = self._display_width  # park it off-screen
+            return True
+        # Re-render the next window once the right edge of the screen passes it
+        visible_end = self._display_width - self._x
+        window_end = self._window_start + self._window_width
+        if visible_end > window_end and window_end < self._text_width:
+            self._render_window(-self._x)
+        else:
+            self._tile_grid.x = self._x + self._window_start
+        return False
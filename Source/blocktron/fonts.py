@@ -0,0 +1,117 @@
+# ------------------------- Compact Fonts --------------------------------------
+# Loader for the .btf glyph caches built by Tools/build_fonts.py. Only the
+# header and glyph index are read up front; each glyph bitmap is read from
+# flash with one bitmaptools.readinto call the first time a label draws it.
+import struct
+import displayio
+import bitmaptools
+from fontio import Glyph
+from adafruit_bitmap_font import bitmap_font
+
+from blocktron.log import timed_print
+
+_HEADER = "<4sH6h"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_INDEX_ENTRY = "<HBBbbbxI"
+_INDEX_ENTRY_SIZE = struct.calcsize(_INDEX_ENTRY)
+_MAGIC = b"BTF1"
+
+
+class CompactFont:
+    """fontio-compatible font backed by a .btf file, loading glyphs lazily."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        header = self._file.read(_HEADER_SIZE)
+        magic, count, w, h, x, y, self.ascent, self.descent = struct.unpack(_HEADER, header)
+        if magic != _MAGIC:
+            raise ValueError("Not a .btf font")
+        self._bounding_box = (w, h, x, y)
+        self.glyph_count = count
+        self._index = self._file.read(count * _INDEX_ENTRY_SIZE)
+        self._glyphs = {}
+        self.bitmap_bytes = 0  # RAM held by loaded glyph bitmaps
+
+    def get_bounding_box(self):
+        return self._bounding_box
+
+    def _find(self, code_point):
+        """Binary-search the index; returns the entry position or -1."""
+        lo, hi = 0, self.glyph_count - 1
+        index = self._index
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            pos = mid * _INDEX_ENTRY_SIZE
+            code = index[pos] | (index[pos + 1] << 8)
+            if code == code_point:
+                return pos
+            if code < code_point:
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return -1
+
+    def _read_glyph(self, code_point):
+        pos = self._find(code_point)
+        if pos < 0:
+            return None
+        _, width, height, dx, dy, shift_x, offset = struct.unpack_from(
+            _INDEX_ENTRY, self._index, pos
+        )
+        bitmap = displayio.Bitmap(max(width, 1), max(height, 1), 2)
+        if width and height:
+            self._file.seek(offset)
+            bitmaptools.readinto(
+                bitmap, self._file, bits_per_pixel=1, element_size=1,
+                reverse_pixels_in_element=True,
+            )
+        self.bitmap_bytes += ((width + 31) // 32) * 4 * height
+        return Glyph(bitmap, 0, width, height, dx, dy, shift_x, 0)
+
+    def load_glyphs(self, code_points):
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        for code_point in code_points:
+            if isinstance(code_point, str):
+                code_point = ord(code_point)
+            if code_point not in self._glyphs:
+                self._glyphs[code_point] = self._read_glyph(code_point)
+
+    def get_glyph(self, code_point):
+        if code_point not in self._glyphs:
+            self._glyphs[code_point] = self._read_glyph(code_point)
+        return self._glyphs[code_point]
+
+    @property
+    def loaded_glyphs(self):
+        return len(self._glyphs)
+
+
+_loaded = {}
+
+
+def load_font(bdf_path):
+    """Return the font for bdf_path, preferring its .btf cache; fonts are shared by path."""
+    font = _loaded.get(bdf_path)
+    if font is None:
+        try:
+            font = CompactFont(bdf_path[:-4] + ".btf")
+        except (OSError, ValueError) as e:
+            timed_print(f"Font cache unavailable for {bdf_path} ({e}); parsing BDF")
+            font = bitmap_font.load_font(bdf_path)
+        _loaded[bdf_path] = font
+    return font
+
+
+def report_memory(labels):
+    """Log glyph RAM per label; labels is a list of (name, bdf_path, text)."""
+    for name, bdf_path, text in labels:
+        font = _loaded.get(bdf_path)
+        if not isinstance(font, CompactFont):
+            timed_print(f"Font {name}: {bdf_path} (BDF, not tracked)")
+            continue
+        timed_print(
+            f"Font {name}: {len(set(text or ''))} glyphs in use,"
+            f" font {font.loaded_glyphs}/{font.glyph_count} loaded, {font.bitmap_bytes} bytes"
+        )
@@ -0,0 +1,152 @@
+# ------------------------- WiFi Link ------------------------------------------
+# Reconnects and name lookups that skip the slow paths. The BSSID and channel
+# of the last access point that worked, and the addresses last resolved for
+# api.blocktron.io, pool.ntp.org and raw.githubusercontent.com, are kept in
+# the last-known-good cache (blocktron/cache.py) so they survive a reset.
+#
+# After a drop the radio first rejoins the saved access point directly, which
+# takes about a second; MatrixPortal's connect, with its full scan, is only
+# the fallback. getaddrinfo() reports no TTL, so resolved addresses are
+# trusted for DNS_TTL, and an address a connection fails on is forgotten so
+# the next attempt resolves the name again.
+import os
+import time
+import binascii
+import adafruit_connection_manager
+
+from blocktron import cache
+from blocktron import telemetry
+from blocktron import log
+from blocktron.log import timed_print
+
+DIRECT_JOIN_TIMEOUT = 3  # Seconds allowed for rejoining the saved access point
+DNS_TTL = 3600  # Seconds a resolved address is used without asking DNS again
+
+
+class AddressBook:
+    """Resolved IPv4 addresses per host name, with the time.time() they were resolved."""
+
+    def __init__(self, socket_pool):
+        self._pool = socket_pool
+        self._entries = dict(cache.value("dns") or {})  # host -> [address, resolved at]
+
+    def resolve(self, host, port=0):
+        now = time.time()
+        entry = self._entries.get(host)
+        if entry is not None and 0 <= now - entry[1] < DNS_TTL:
+            return entry[0]
+        address = self._pool.getaddrinfo(host, port)[0][4][0]
+        telemetry.count(telemetry.DNS_LOOKUPS)
+        self._entries[host] = [address, int(now)]
+        cache.put("dns", dict(self._entries))
+        return address
+
+    def forget(self, host):
+        if self._entries.pop(host, None) is not None:
+            cache.put("dns", dict(self._entries))
+
+
+class _SocketPool:
+    """The radio's socket pool, with getaddrinfo() answered from the address book."""
+
+    def __init__(self, socket_pool, addresses):
+        self._pool = socket_pool
+        self._addresses = addresses
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        address = self._addresses.resolve(host, port)
+        return [(self._pool.AF_INET, type or self._pool.SOCK_STREAM, proto, "", (address, port))]
+
+
+class _PinnedSocket:
+    """TLS socket that connects to the saved address; the certificate is still checked for the name."""
+
+    def __init__(self, sock, addresses):
+        self._sock = sock
+        self._addresses = addresses
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+    def connect(self, address):
+        host, port = address
+        self._sock.connect((self._addresses.resolve(host, port), port))
+
+
+class _SSLContext:
+    """The radio's SSL context, pinning every socket it wraps to the address book.
+
+    adafruit_connection_manager connects TLS sockets by host name, which would
+    resolve the name again inside connect().
+    """
+
+    def __init__(self, ssl_context, addresses):
+        self._context = ssl_context
+        self._addresses = addresses
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+    def wrap_socket(self, sock, server_side=False, server_hostname=None):
+        wrapped = self._context.wrap_socket(sock, server_side=server_side, server_hostname=server_hostname)
+        return _PinnedSocket(wrapped, self._addresses)
+
+
+class Link:
+    """WiFi reconnects and DNS for the HTTP pool and NTP.
+
+    scan_connect is MatrixPortal's network.connect, used when the saved
+    access point can't be rejoined directly.
+    """
+
+    def __init__(self, radio, scan_connect):
+        self._radio = radio
+        self._scan_connect = scan_connect
+        self._ssid = os.getenv("CIRCUITPY_WIFI_SSID")
+        self._password = os.getenv("CIRCUITPY_WIFI_PASSWORD") or ""
+        self.addresses = AddressBook(adafruit_connection_manager.get_radio_socketpool(radio))
+        self.socket_pool = _SocketPool(adafruit_connection_manager.get_radio_socketpool(radio), self.addresses)
+        self.ssl_context = _SSLContext(adafruit_connection_manager.get_radio_ssl_context(radio), self.addresses)
+
+    def _join_saved(self):
+        saved = cache.value("wifi")
+        if not saved or not self._ssid:
+            return False
+        bssid, channel = saved
+        try:
+            self._radio.connect(
+                self._ssid, self._password,
+                channel=channel, bssid=binascii.unhexlify(bssid), timeout=DIRECT_JOIN_TIMEOUT,
+            )
+        except (ConnectionError, OSError, RuntimeError, ValueError) as e:
+            log.warn(f"WiFi: rejoining {bssid} on channel {channel} failed: {e}; scanning")
+            return False
+        return self._radio.connected
+
+    def connect(self):
+        """Bring WiFi back up: the saved access point first, a full scan if that fails."""
+        if self._radio.connected:
+            return
+        started = telemetry.start()
+        direct = self._join_saved()
+        if not direct:
+            telemetry.count(telemetry.WIFI_SCANS)
+            self._scan_connect()
+        telemetry.stop(telemetry.WIFI_CONNECT, started)
+        telemetry.count(telemetry.WIFI_RECONNECTS)
+        timed_print(
+            f"WiFi: {'rejoined directly' if direct else 'joined after a scan'}"
+            f" in {(time.monotonic_ns() - started) // 1_000_000}ms"
+        )
+        self.sample()
+
+    def sample(self):
+        """Record the RSSI and save the access point we are on for the next rejoin."""
+        ap = self._radio.ap_info
+        if ap is None:
+            return
+        telemetry.gauge(telemetry.RSSI, ap.rssi)
+        cache.put("wifi", [binascii.hexlify(ap.bssid).decode(), ap.channel])
@@ -0,0 +1,133 @@
+# ------------------------- Live Updates ---------------------------------------
+# Optional push mode over MQTT. When the cloud settings name a broker
+# (conf_live_broker), market values, ticker text and this device's settings
+# arrive as they change instead of on the poll cadence. The polling jobs stand
+# down only while the subscription is up; if it drops, they resume and the
+# feed reconnects on the live circuit breaker's backoff.
+#
+# Topics (the broker retains the latest message on each, so a fresh
+# subscription gets the current values at once):
+#   blocktron/market                     btc_price,block_height,moscow_time
+#   blocktron/ticker                     ticker text
+#   blocktron/devices/<device_id>/settings  get_settings JSON for this device
+import json
+import adafruit_connection_manager
+try:
+    import adafruit_minimqtt.adafruit_minimqtt as MQTT
+except ImportError:
+    MQTT = None  # Optional library; only needed once the cloud settings name a broker
+
+from blocktron import config
+from blocktron import api
+from blocktron import log
+from blocktron.retry import CircuitBreaker
+from blocktron.log import timed_print
+
+LIVE_TOPIC_MARKET = "blocktron/market"
+LIVE_TOPIC_TICKER = "blocktron/ticker"
+LIVE_TOPIC_SETTINGS = "blocktron/devices/{}/settings"
+LIVE_KEEP_ALIVE = 60  # Seconds between MQTT pings while nothing is published
+LIVE_SOCKET_TIMEOUT = 0.01  # Longest a poll blocks waiting for a message
+LIVE_POLL_INTERVAL = 0.5  # Seconds between polls of the subscription
+
+
+class LiveFeed:
+    """MQTT subscription that hands decoded updates to the display callbacks.
+
+    The client authenticates with the device_id and apiKey from
+    device_keys.json. poll() is called from a scheduler job; it connects
+    when allowed and delivers whatever has arrived since the last call.
+    """
+
+    def __init__(self, radio, on_market, on_ticker, on_settings):
+        self._radio = radio
+        self._on_market = on_market
+        self._on_ticker = on_ticker
+        self._on_settings = on_settings
+        self._client = None
+        self._broker = None  # (host, port) the client was connected to
+        self.subscribed = False
+        self.breaker = CircuitBreaker("live", api.retry_policy)
+        self.messages = 0
+
+    def _connect(self, broker):
+        host, port = broker
+        client = MQTT.MQTT(
+            broker=host,
+            port=port,
+            username=config.device_id,
+            password=config.device_api_key,
+            client_id=config.device_id,
+            is_ssl=port == 8883,
+            keep_alive=LIVE_KEEP_ALIVE,
+            socket_timeout=LIVE_SOCKET_TIMEOUT,
+            connect_retries=1,
+            socket_pool=adafruit_connection_manager.get_radio_socketpool(self._radio),
+            ssl_context=adafruit_connection_manager.get_radio_ssl_context(self._radio),
+        )
+        client.on_message = self._message
+        self._client = client
+        self._broker = broker
+        client.connect()
+        client.subscribe([
+            (LIVE_TOPIC_MARKET, 0),
+            (LIVE_TOPIC_TICKER, 0),
+            (LIVE_TOPIC_SETTINGS.format(config.device_id), 1),
+        ])
+        self.subscribed = True
+        timed_print(f"Live: subscribed on {host}:{port}")
+
+    def close(self):
+        if self._client is None:
+            return
+        try:
+            self._client.disconnect()
+        except (MQTT.MMQTTException, OSError, RuntimeError):
+            pass  # Already gone
+        self._client = None
+        if self.subscribed:
+            self.subscribed = False
+            timed_print("Live: closed; polling takes over")
+
+    def _fail(self, now, what, e):
+        log.warn(f"Live: {what}: {e}")
+        self.close()
+        self.breaker.record_failure(now)
+
+    def poll(self, now):
+        """Connect if needed and deliver pending messages; returns True while subscribed."""
+        broker = (config.conf_live_broker, config.conf_live_port)
+        if self._client is not None and (broker != self._broker or not self._client.is_connected()):
+            self.close()  # Dropped, or the cloud settings moved the feed to another broker
+        if self._client is None:
+            if not broker[0] or not self.breaker.allow(now):
+                return False
+            if MQTT is None:
+                self._fail(now, "connect failed", "adafruit_minimqtt is not in lib")
+                return False
+            try:
+                self._connect(broker)
+            except (MQTT.MMQTTException, OSError, RuntimeError) as e:
+                self._fail(now, "connect failed", e)
+                return False
+            self.breaker.record_success()
+        try:
+            self._client.loop(timeout=LIVE_SOCKET_TIMEOUT)
+        except (MQTT.MMQTTException, OSError, RuntimeError) as e:
+            self._fail(now, "stream dropped", e)
+            return False
+        return self.subscribed
+
+    def _message(self, client, topic, message):
+        self.messages += 1
+        try:
+            if topic == LIVE_TOPIC_MARKET:
+                price, height, moscow = message.split(",")
+                self._on_market(int(price), int(height), int(moscow))
+            elif topic == LIVE_TOPIC_TICKER:
+                if message:
+                    self._on_ticker(message)
+            else:
+                self._on_settings(json.loads(message))
+        except (ValueError, TypeError) as e:
+            log.warn(f"Live: bad message on {topic}: {e}")
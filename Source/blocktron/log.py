@@ -0,0 +1,174 @@
+# ------------------------- Ring-Buffer Logger ---------------------------------
+# Logging stores a fixed-size record (tick, event code, level and up to three
+# argument references) in arrays allocated at import. Nothing is formatted
+# until drain() prints the records to serial, or flush() keeps the newest ones
+# in NVM so they can be read back after a reset. Hot paths log an event code
+# with numbers or strings that already exist; timed_print() and warn() record
+# free text for the cold paths.
+import time
+import struct
+import supervisor
+import microcontroller
+from array import array
+
+from blocktron import config
+
+DEBUG = 0
+INFO = 1
+WARN = 2
+ERROR = 3
+
+RING_SIZE = 64  # Records kept; drain() runs early if the ring fills up
+MAX_ARGS = 3
+LOG_NVM_OFFSET = 6144  # nvm[6144:] holds the newest lines across a reset; the cache stops here
+_NVM_HEADER = "<4sH"  # magic, payload length
+_NVM_HEADER_SIZE = struct.calcsize(_NVM_HEADER)
+_NVM_MAGIC = b"BTL1"
+_TICKS_PERIOD = 1 << 29  # supervisor.ticks_ms() wraps around here
+
+# Event codes index EVENTS, which holds (level, format) for each code
+TEXT = 0  # Free text from timed_print() / warn(); the arguments are joined with spaces
+HTTP_REQUEST = 1
+SETTINGS_FETCH = 2
+SETTINGS_UNCHANGED = 3
+SETTINGS_UPDATED = 4
+MARKET_FETCHED = 5
+TICKER_UPDATED = 6
+TIME_UPDATED = 7
+MEMORY_CHECK = 8
+GC_DONE = 9
+OTA_UNCHANGED = 10
+EVENTS = (
+    (INFO, None),
+    (INFO, "HTTP {}: handshake={}ms request={}ms"),
+    (DEBUG, "Fetching settings from {}"),
+    (DEBUG, "Cloud settings unchanged"),
+    (INFO, "Cloud settings have been updated"),
+    (INFO, "Fetched Data: BTC={}, BlockHeight={}, MoscowTime={}"),
+    (INFO, "Updated Ticker: {}"),
+    (DEBUG, "Updated Time Display: {}"),
+    (DEBUG, "Memory Check: {} of {} bytes free"),
+    (INFO, "GC processed. Current Mem {} bytes."),
+    (DEBUG, "OTA: No version change detected"),
+)
+
+_NO_ARG = object()  # Fills unused argument slots
+_ticks = array("L", [0] * RING_SIZE)
+_codes = bytearray(RING_SIZE)
+_levels = bytearray(RING_SIZE)
+_args = [_NO_ARG] * (RING_SIZE * MAX_ARGS)
+_written = 0  # Records logged so far; the next one goes to slot _written % RING_SIZE
+_drained = 0  # Records printed to serial so far
+
+
+def _record(code, level, a, b, c):
+    global _written
+    if level < config.conf_device_log_level:
+        return
+    if _written - _drained >= RING_SIZE:
+        drain()
+    slot = _written % RING_SIZE
+    _ticks[slot] = supervisor.ticks_ms()
+    _codes[slot] = code
+    _levels[slot] = level
+    base = slot * MAX_ARGS
+    _args[base] = a
+    _args[base + 1] = b
+    _args[base + 2] = c
+    _written += 1
+
+
+def event(code, a=_NO_ARG, b=_NO_ARG, c=_NO_ARG):
+    """Log event code with up to three arguments, formatted later with EVENTS[code]."""
+    _record(code, EVENTS[code][0], a, b, c)
+
+
+def _text(level, args):
+    if len(args) > MAX_ARGS:
+        args = (" ".join(str(a) for a in args),)
+    args += (_NO_ARG,) * (MAX_ARGS - len(args))
+    _record(TEXT, level, args[0], args[1], args[2])
+
+
+def timed_print(*args):
+    """Log free text at INFO; the line is stamped with the time it was logged."""
+    _text(INFO, args)
+
+
+def warn(*args):
+    """Log free text at WARN, for failures worth keeping when the level is raised."""
+    _text(WARN, args)
+
+
+def _format(slot, now_ticks, now_seconds):
+    age_ms = (now_ticks - _ticks[slot]) % _TICKS_PERIOD
+    local_struct = time.localtime(now_seconds - age_ms // 1000)
+    base = slot * MAX_ARGS
+    args = [a for a in _args[base:base + MAX_ARGS] if a is not _NO_ARG]
+    fmt = EVENTS[_codes[slot]][1]
+    message = " ".join(str(a) for a in args) if fmt is None else fmt.format(*args)
+    return "[{:04d}/{:02d}/{:02d} {:02d}:{:02d}:{:02d}] {}{}".format(
+        local_struct.tm_year,
+        local_struct.tm_mon,
+        local_struct.tm_mday,
+        local_struct.tm_hour,
+        local_struct.tm_min,
+        local_struct.tm_sec,
+        "WARN: " if _levels[slot] >= WARN else "",
+        message,
+    )
+
+
+def _clock():
+    """(ticks, local seconds) read together, to date every record in one pass."""
+    local_seconds = int(time.mktime(time.localtime()) + config.conf_device_timezone_utc_offset * 3600)
+    return supervisor.ticks_ms(), local_seconds
+
+
+def drain():
+    """Print every record not yet printed to serial."""
+    global _drained
+    if _drained == _written:
+        return
+    if not config.DEVICE_LOGGING_ENABLED:
+        _drained = _written
+        return
+    now_ticks, now_seconds = _clock()
+    while _drained < _written:
+        print(_format(_drained % RING_SIZE, now_ticks, now_seconds))
+        _drained += 1
+
+
+def flush():
+    """Drain to serial and keep the newest records in NVM; call before a planned reset."""
+    drain()
+    kept = min(_written, RING_SIZE)
+    if not kept:
+        return
+    now_ticks, now_seconds = _clock()
+    lines = [_format(n % RING_SIZE, now_ticks, now_seconds) for n in range(_written - kept, _written)]
+    payload = "\n".join(lines).encode()
+    room = len(microcontroller.nvm) - LOG_NVM_OFFSET - _NVM_HEADER_SIZE
+    if len(payload) > room:
+        # Keep the newest lines that fit
+        payload = payload[len(payload) - room:]
+        payload = payload[payload.find(b"\n") + 1:]
+    end = LOG_NVM_OFFSET + _NVM_HEADER_SIZE + len(payload)
+    microcontroller.nvm[LOG_NVM_OFFSET:end] = struct.pack(_NVM_HEADER, _NVM_MAGIC, len(payload)) + payload
+
+
+def print_previous():
+    """Print the lines flush() kept before the last reset, once; returns how many there were."""
+    nvm = microcontroller.nvm
+    magic, length = struct.unpack(_NVM_HEADER, nvm[LOG_NVM_OFFSET:LOG_NVM_OFFSET + _NVM_HEADER_SIZE])
+    if magic != _NVM_MAGIC:
+        return 0
+    start = LOG_NVM_OFFSET + _NVM_HEADER_SIZE
+    lines = bytes(nvm[start:start + length]).decode("utf-8", "replace").split("\n")
+    if config.DEVICE_LOGGING_ENABLED:
+        print(f"---- {len(lines)} log lines from before the last reset ----")
+        for line in lines:
+            print(line)
+        print("---- end of previous log ----")
+    nvm[LOG_NVM_OFFSET:LOG_NVM_OFFSET + len(_NVM_MAGIC)] = bytes(len(_NVM_MAGIC))
+    return len(lines)
@@ -0,0 +1,248 @@
+# ------------------------- Networking -----------------------------------------
+import time
+import socketpool
+import wifi
+import rtc
+import adafruit_ntp
+import adafruit_requests
+import adafruit_connection_manager
+
+from blocktron import telemetry
+from blocktron import log
+from blocktron.log import timed_print
+
+HTTP_CONNECT_TIMEOUT = 10  # Seconds allowed for a TCP + TLS handshake
+STUCK_NETWORK_TIMEOUT = 900  # Seconds without a successful request before the stack is suspected
+NTP_SERVER = "pool.ntp.org"
+NTP_ATTEMPTS = 3  # NTP queries at boot before carrying on with the RTC as it is
+NTP_RETRY_DELAY = 1  # Seconds between NTP attempts
+
+
+class HttpPool:
+    """Keep-alive HTTP(S) sessions, one per host.
+
+    Each host gets its own adafruit_requests.Session so its socket is parked in
+    the connection manager between requests instead of being torn down, and
+    the next poll skips the TCP and TLS handshake. CircuitPython's ssl module
+    does not expose TLS session tickets, so reuse happens at the socket level.
+    Handshake and request time are logged separately.
+
+    With a link (blocktron.link.Link), sockets are opened through its socket
+    pool and SSL context so they connect to saved addresses, and an address
+    that fails to connect is forgotten.
+    """
+
+    def __init__(self, radio, connect=None, link=None):
+        self._link = link
+        if link is not None:
+            self._socket_pool = link.socket_pool
+            self._ssl_context = link.ssl_context
+        else:
+            self._socket_pool = adafruit_connection_manager.get_radio_socketpool(radio)
+            self._ssl_context = adafruit_connection_manager.get_radio_ssl_context(radio)
+        self._connection_manager = adafruit_connection_manager.get_connection_manager(
+            self._socket_pool
+        )
+        self._connect = connect  # called to bring WiFi back up before a request
+        self._radio = radio
+        self._sessions = {}
+        self._sockets = {}
+        self.last_success = time.monotonic()  # When any request last got a response
+
+    @staticmethod
+    def _split_url(url):
+        proto, _, rest = url.partition("://")
+        host = rest.split("/", 1)[0]
+        is_ssl = proto == "https"
+        port = 443 if is_ssl else 80
+        if ":" in host:
+            host, port = host.split(":", 1)
+            port = int(port)
+        return host, port, is_ssl
+
+    def _session(self, host):
+        session = self._sessions.get(host)
+        if session is None:
+            session = adafruit_requests.Session(
+                self._socket_pool, self._ssl_context, session_id=host
+            )
+            self._sessions[host] = session
+        return session
+
+    def _open(self, host, port, is_ssl):
+        """Open and park a socket for host; returns the handshake time in ms."""
+        start = time.monotonic_ns()
+        try:
+            sock = self._connection_manager.get_socket(
+                host,
+                port,
+                "https:" if is_ssl else "http:",
+                session_id=host,
+                timeout=HTTP_CONNECT_TIMEOUT,
+                is_ssl=is_ssl,
+                ssl_context=self._ssl_context,
+            )
+        except (OSError, RuntimeError):
+            if self._link is not None:
+                self._link.addresses.forget(host)  # The saved address may have moved
+            raise
+        self._connection_manager.free_socket(sock)
+        self._sockets[host] = sock
+        return (time.monotonic_ns() - start) // 1_000_000
+
+    def drop(self, host):
+        """Close the parked socket for host so the next request reconnects."""
+        sock = self._sockets.pop(host, None)
+        if sock is None:
+            return
+        try:
+            self._connection_manager.close_socket(sock)
+        except (RuntimeError, OSError):
+            pass  # Already closed or no longer managed
+
+    def request(self, method, url, **kwargs):
+        if self._connect is not None and not self._radio.connected:
+            self._connect()
+        host, port, is_ssl = self._split_url(url)
+        handshake_ms = 0
+        if host not in self._sockets:
+            handshake_ms = self._open(host, port, is_ssl)
+        start = time.monotonic_ns()
+        try:
+            response = self._session(host).request(method, url, **kwargs)
+        except OSError:
+            # The parked socket was dropped by the peer; reconnect once and retry
+            self.drop(host)
+            telemetry.count(telemetry.RECONNECTS)
+            handshake_ms += self._open(host, port, is_ssl)
+            start = time.monotonic_ns()
+            response = self._session(host).request(method, url, **kwargs)
+        if response.socket is not self._sockets.get(host):
+            # adafruit_requests replaced a stale socket internally
+            self._sockets[host] = response.socket
+            telemetry.count(telemetry.RECONNECTS)
+        self.last_success = time.monotonic()
+        log.event(log.HTTP_REQUEST, host, handshake_ms, (time.monotonic_ns() - start) // 1_000_000)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+class ValidatorCache:
+    """ETag / Last-Modified validators per URL for conditional requests.
+
+    Callers add the conditional headers, treat a 304 as "unchanged" and skip
+    parsing entirely, and only store the new validators once a 200 body has
+    been applied successfully. Only for GETs (settings, OTA version check): a
+    server answers the conditional headers on a POST with 412.
+    """
+
+    def __init__(self):
+        self._validators = {}
+
+    def headers(self, url, headers=None):
+        """Return headers with If-None-Match / If-Modified-Since added for url."""
+        if headers is None:
+            headers = {}
+        validators = self._validators.get(url)
+        if validators is not None:
+            etag, last_modified = validators
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def is_not_modified(self, response):
+        if response.status_code == 304:
+            telemetry.count(telemetry.NOT_MODIFIED)
+            return True
+        return False
+
+    def store(self, url, response):
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if etag or last_modified:
+            self._validators[url] = (etag, last_modified)
+        else:
+            self._validators.pop(url, None)
+
+    def forget(self, url):
+        self._validators.pop(url, None)
+
+
+def body_reader(response, buffer):
+    """Return a readinto(buffer) for response's body, returning 0 at the end.
+
+    adafruit_requests (4.x, checked against 4.1.17) has no public readinto, and
+    iter_content allocates a bytes object per chunk. Response._readinto fills
+    the caller's buffer in place, so it is used while the library has it;
+    iter_content, copied into buffer, is the fallback if an update drops it.
+    """
+    readinto = getattr(response, "_readinto", None)
+    if readinto is not None:
+        return readinto
+    chunks = response.iter_content(len(buffer))
+
+    def copy_chunk(buffer):
+        for chunk in chunks:
+            n = len(chunk)
+            buffer[:n] = chunk
+            return n
+        return 0
+
+    return copy_chunk
+
+
+validators = ValidatorCache()
+http = None  # HttpPool, created by init() once the MatrixPortal network exists
+
+
+def init(radio, connect=None, link=None):
+    global http
+    http = HttpPool(radio, connect=connect, link=link)
+    return http
+
+
+def network_stuck(now):
+    """True if nothing has succeeded for STUCK_NETWORK_TIMEOUT and the joined gateway is unreachable.
+
+    API errors alone never count: if the local gateway still answers a ping,
+    the backend is down and rebooting this device would not help. Neither
+    does a disconnected radio: while the AP is down, Link keeps rejoining and
+    scanning, and a reboot would only land in the same place.
+    """
+    if http is None or now - http.last_success < STUCK_NETWORK_TIMEOUT:
+        return False
+    radio = http._radio
+    gateway = radio.ipv4_gateway
+    if not radio.connected or gateway is None:
+        return False
+    try:
+        if radio.ping(gateway, timeout=2) is not None:
+            return False
+    except (OSError, RuntimeError) as e:
+        log.warn(f"Gateway ping failed: {e}")
+    return True
+
+
+def sync_time(attempt=1, pool=None):
+    """One NTP query; sets the RTC and returns True on success.
+
+    Retries are left to the caller (app.py's ntp job), which waits
+    NTP_RETRY_DELAY between attempts without blocking the other jobs.
+    """
+    if pool is None:
+        pool = socketpool.SocketPool(wifi.radio)
+    ntp = adafruit_ntp.NTP(pool, server=NTP_SERVER, port=123)
+    try:
+        rtc.RTC().datetime = ntp.datetime
+        timed_print("Time synced via NTP on attempt", attempt)
+        return True
+    except OSError as e:
+        log.warn(f"NTP sync attempt {attempt} failed:", e)
+        return False
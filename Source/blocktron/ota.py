@@ -0,0 +1,271 @@
+# -------- OTA Updates --------
+import os
+import json
+import time
+import hashlib
+import binascii
+import microcontroller
+import storage
+
+from blocktron import net
+from blocktron import cache
+from blocktron import telemetry
+from blocktron import log
+from blocktron.log import timed_print
+
+# -------- OTA CONFIG (edit repo info only) --------
+OTA_ENABLED = True
+OTA_CHECK_INTERVAL = 3600  # seconds
+OTA_REPO_BASE = "https://raw.githubusercontent.com/GingerSherpa/BlockTron/main/Source/"  # <-- set
+# Every OTA-managed file (code, fonts, compiled modules) is listed in the manifest
+# with its size and SHA-256; only files whose local copy differs are downloaded.
+OTA_MANIFEST_URL = f"{OTA_REPO_BASE}/ota_manifest.json"
+OTA_CHUNK_SIZE = 1024  # bytes streamed to flash per read
+OTA_MAX_DOWNLOAD_ATTEMPTS = 3  # reboots spent resuming a download before giving up
+_OTA_STAGE_FILE = "/ota_stage.json"
+_OTA_CONFIRM_FILE = "/ota_confirmed"
+_ota_buffer = bytearray(OTA_CHUNK_SIZE)  # reused for every download and hash
+
+def _ota_exists(p):
+    try:
+        os.stat(p)
+        return True
+    except OSError:
+        return False
+
+def ota_mark_success():
+    try:
+        if microcontroller.nvm[0] == 2:
+            microcontroller.nvm[0] = 0
+            microcontroller.nvm[1] = 0
+            timed_print("OTA: confirmed restarting in 5 seconds")
+            time.sleep(5)
+            log.flush()
+            microcontroller.reset()
+    except Exception as e:
+        log.warn("OTA confirm err:", e)
+
+def _http_get(url, stream=False, timeout=10, headers=None):
+    # Use the same pooled keep-alive sessions as the API calls
+    resp = net.http.get(url, headers=headers, timeout=timeout)
+    return resp
+
+def _ota_file_size(p):
+    try:
+        return os.stat(p)[6]
+    except OSError:
+        return 0
+
+def _ota_make_parent_dirs(name):
+    """Create the directories above name, e.g. for a module new to this device."""
+    parts = name.split("/")[:-1]
+    path = ""
+    for part in parts:
+        path = f"{path}/{part}" if path else part
+        if not _ota_exists(path):
+            os.mkdir(path)
+
+def _ota_hash_file(path, hasher):
+    """Feed an on-flash file into hasher through the shared buffer."""
+    view = memoryview(_ota_buffer)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(_ota_buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+
+def _ota_sha256(path):
+    try:
+        hasher = hashlib.new("sha256")
+        _ota_hash_file(path, hasher)
+        return binascii.hexlify(hasher.digest()).decode()
+    except OSError:
+        return None
+
+def _fetch_manifest(conditional=False):
+    """Return the published {name: {"size", "sha256"}} map, or None.
+
+    With conditional=True an unchanged manifest (304) also returns None.
+    """
+    resp = None
+    started = telemetry.start()
+    try:
+        headers = net.validators.headers(OTA_MANIFEST_URL) if conditional else None
+        resp = _http_get(OTA_MANIFEST_URL, timeout=10, headers=headers)
+        if net.validators.is_not_modified(resp):
+            return None
+        if resp.status_code != 200:
+            log.warn("OTA manifest fail", resp.status_code)
+            return None
+        files = resp.json().get("files")
+        if conditional:
+            # Safe to cache: any difference reboots into download mode anyway
+            net.validators.store(OTA_MANIFEST_URL, resp)
+        return files
+    except Exception as e:
+        log.warn("OTA manifest err:", e)
+        return None
+    finally:
+        telemetry.stop(telemetry.OTA_MANIFEST, started)
+        try:
+            if resp:
+                resp.close()
+        except Exception:
+            pass
+
+def _download_to_temp(name, url, expected):
+    """Stream url to <name>.new in OTA_CHUNK_SIZE pieces and verify its SHA-256.
+
+    Data goes to <name>.part first; if a previous attempt was interrupted the
+    download resumes from the end of that file with a Range request.
+    """
+    part = name + ".part"
+    size = expected["size"]
+    hasher = hashlib.new("sha256")
+    offset = _ota_file_size(part)
+    if offset > size:
+        os.remove(part)
+        offset = 0
+    elif offset:
+        _ota_hash_file(part, hasher)
+    resp = None
+    span_started = telemetry.start()
+    try:
+        _ota_make_parent_dirs(name)
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        resp = _http_get(url, timeout=20, headers=headers)
+        if resp.status_code == 200:
+            if offset:
+                # Server ignored the Range header; start over
+                hasher = hashlib.new("sha256")
+                offset = 0
+            mode = "wb"
+        elif resp.status_code == 206:
+            mode = "ab"
+        else:
+            log.warn("OTA GET fail", name, resp.status_code)
+            return False
+        view = memoryview(_ota_buffer)
+        started = time.monotonic()
+        readinto = net.body_reader(resp, _ota_buffer)
+        with open(part, mode) as f:
+            while True:
+                n = readinto(_ota_buffer)
+                if not n:
+                    break
+                offset += n
+                if offset > size:
+                    log.warn("OTA size mismatch", name, offset)
+                    break
+                hasher.update(view[:n])
+                f.write(view[:n])
+        digest = binascii.hexlify(hasher.digest()).decode()
+        if offset != size or digest != expected["sha256"]:
+            log.warn("OTA hash mismatch", name)
+            os.remove(part)
+            return False
+        if _ota_exists(name + ".new"):
+            os.remove(name + ".new")
+        os.rename(part, name + ".new")
+        timed_print(
+            "OTA fetched", name, size, "bytes in",
+            f"{time.monotonic() - started:.1f}s",
+        )
+        return True
+    except Exception as e:
+        # Keep the .part file so the next attempt can resume
+        log.warn("OTA fetch err:", name, e)
+        return False
+    finally:
+        telemetry.stop(telemetry.OTA_DOWNLOAD, span_started)
+        try:
+            if resp:
+                resp.close()
+        except Exception:
+            pass
+
+def _ota_changed_files(manifest):
+    """Names from the manifest whose local copy is missing or differs."""
+    changed = []
+    started = telemetry.start()
+    for name, expected in manifest.items():
+        # Cheap size check first; only hash files that could still match
+        if _ota_file_size(name) != expected["size"] or _ota_sha256(name) != expected["sha256"]:
+            changed.append(name)
+        elif name.endswith(".mpy") and _ota_exists(name[:-4] + ".py"):
+            # A source module next to its .mpy is imported first; re-stage so boot.py moves it aside
+            changed.append(name)
+    telemetry.stop(telemetry.OTA_DIFF, started)
+    return changed
+
+def check_for_update_and_stage():
+    if not OTA_ENABLED:
+        return
+    manifest = _fetch_manifest(conditional=True)
+    if not manifest or not _ota_changed_files(manifest):
+        log.event(log.OTA_UNCHANGED)
+        return
+    timed_print("OTA: version change detected; rebooting into download mode")
+    cache.flush(force=True)         # keep the latest values for the first frames after the update
+    microcontroller.nvm[0] = 1      # tell boot.py to disable MSC on next boot
+    log.flush()
+    microcontroller.reset()
+
+def ota_download_stage_if_needed():
+    if microcontroller.nvm[0] != 1:
+        return
+    # MSC is already off (boot.py). Now we can write.
+    try:
+        storage.remount("/", False)
+    except Exception as e:
+        log.warn("OTA: remount RW failed:", e)
+        microcontroller.nvm[0] = 0
+        return
+
+    manifest = _fetch_manifest()
+    ok = manifest is not None
+    targets = _ota_changed_files(manifest) if ok else []
+    timed_print("OTA: files to fetch:", targets)
+    for name in targets:
+        ok = _download_to_temp(name, f"{OTA_REPO_BASE}/{name}", manifest[name])
+        if not ok:
+            break
+    if ok and not targets:
+        timed_print("OTA: nothing changed; leaving download mode")
+        microcontroller.nvm[0] = 0
+        microcontroller.nvm[2] = 0
+        try: storage.remount("/", True)
+        except Exception: pass
+        return
+    if not ok:
+        attempts = microcontroller.nvm[2] + 1
+        if attempts < OTA_MAX_DOWNLOAD_ATTEMPTS:
+            # Stay in download mode; partial files resume after the reboot
+            log.warn("OTA: download failed; retrying after reboot", attempts)
+            microcontroller.nvm[2] = attempts
+            try: storage.remount("/", True)
+            except Exception: pass
+            log.flush()
+            microcontroller.reset()
+        log.warn("OTA: download failed; aborting")
+        for name in targets:
+            for suffix in (".new", ".part"):
+                try: os.remove(name + suffix)
+                except Exception: pass
+        microcontroller.nvm[0] = 0
+        microcontroller.nvm[2] = 0
+        try: storage.remount("/", True)
+        except Exception: pass
+        return
+
+    with open(_OTA_STAGE_FILE, "w") as f:
+        json.dump({"files": targets}, f)
+    try: storage.remount("/", True)
+    except Exception: pass
+
+    timed_print("OTA: staged; rebooting for atomic swap")
+    microcontroller.nvm[2] = 0
+    microcontroller.nvm[0] = 3      # boot.py will atomically swap and set verify
+    log.flush()
+    microcontroller.reset()
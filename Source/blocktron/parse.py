@@ -0,0 +1,215 @@
+# ------------------------- Streaming Metrics Parser ---------------------------
+# Pulls btc_price, block_height and moscow_time straight out of the live_data
+# response stream. Bytes are read through net.body_reader into one reused
+# buffer and scanned in place, so a poll builds no JSON objects and no
+# per-metric strings, and scanning stops as soon as all three values are in.
+#
+# Two wire formats are understood, picked from the response Content-Type:
+#   application/json  [{"metric_name": "btc_price", "metric_value": "97000"}, ...]
+#                     (other fields in a row, nested objects and arrays included, are skipped)
+#   text/csv          97000,880123,1031   (btc_price,block_height,moscow_time)
+from blocktron import net
+
+ACCEPT_HEADER = "text/csv, application/json;q=0.9"
+
+PRICE_SLOT = 0
+BLOCKHEIGHT_SLOT = 1
+MOSCOW_SLOT = 2
+_SLOT_NAMES = (b"btc_price", b"block_height", b"moscow_time")
+
+_KEY_NAME = b"metric_name"
+_KEY_VALUE = b"metric_value"
+_TOKEN_MAX = 32  # Longest key, name or value we need to compare or convert
+_ROW_DEPTH = 2  # Rows are the objects inside the top-level array
+
+_QUOTE = 0x22
+_BACKSLASH = 0x5C
+_COLON = 0x3A
+_COMMA = 0x2C
+_OPEN_BRACE = 0x7B
+_CLOSE_BRACE = 0x7D
+_OPEN_BRACKET = 0x5B
+_CLOSE_BRACKET = 0x5D
+_NEWLINE = 0x0A
+_MINUS = 0x2D
+
+
+def _to_int(token, length):
+    """Parse a decimal integer from token[:length]; None if it is not one."""
+    start = 0
+    while start < length and token[start] <= 0x20:
+        start += 1
+    while length > start and token[length - 1] <= 0x20:
+        length -= 1
+    negative = start < length and token[start] == _MINUS
+    if negative:
+        start += 1
+    if start >= length:
+        return None
+    value = 0
+    for i in range(start, length):
+        c = token[i] - 0x30
+        if c < 0 or c > 9:
+            return None
+        value = value * 10 + c
+    return -value if negative else value
+
+
+def _token_is(token, length, name):
+    if length != len(name):
+        return False
+    for i in range(length):
+        if token[i] != name[i]:
+            return False
+    return True
+
+
+class MetricsParser:
+    """Reusable parser; one instance serves every poll."""
+
+    def __init__(self, chunk_size=256):
+        self._buffer = bytearray(chunk_size)
+        self._token = bytearray(_TOKEN_MAX)
+        self.values = [None, None, None]
+        self.bytes_read = 0
+
+    def _reset(self):
+        self.values[PRICE_SLOT] = None
+        self.values[BLOCKHEIGHT_SLOT] = None
+        self.values[MOSCOW_SLOT] = None
+        self.bytes_read = 0
+        self._found = 0
+        self._length = 0
+        # JSON state
+        self._in_string = False
+        self._escaped = False
+        self._bare = False
+        self._after_colon = False
+        self._depth = 0  # Open { and [ around the current byte
+        self._key = None
+        self._slot = -1
+        self._value = None
+        # CSV state
+        self._field = 0
+
+    def parse(self, response):
+        """Read response until all three metrics are found; returns True if they were."""
+        self._reset()
+        content_type = response.headers.get("content-type", "")
+        is_csv = content_type.startswith("text/csv")
+        feed = self._feed_csv if is_csv else self._feed_json
+        buffer = self._buffer
+        readinto = net.body_reader(response, buffer)
+        while self._found < 3:
+            n = readinto(buffer)
+            if not n:
+                break
+            self.bytes_read += n
+            feed(buffer, n)
+        if self._found < 3 and is_csv:
+            self._end_csv_field()  # Last field may have no trailing newline
+        return self._found == 3
+
+    def _store(self, slot, value):
+        if slot >= 0 and value is not None and self.values[slot] is None:
+            self.values[slot] = value
+            self._found += 1
+
+    def _push(self, c):
+        if self._length < _TOKEN_MAX:
+            self._token[self._length] = c
+        self._length += 1  # Overlong tokens stop matching and stop parsing as ints
+
+    def _end_token(self, quoted):
+        token, length = self._token, min(self._length, _TOKEN_MAX + 1)
+        self._length = 0
+        if self._depth != _ROW_DEPTH:
+            return  # Inside a nested object or array; only a row's own keys count
+        if not self._after_colon:
+            if quoted:
+                if _token_is(token, length, _KEY_NAME):
+                    self._key = _KEY_NAME
+                elif _token_is(token, length, _KEY_VALUE):
+                    self._key = _KEY_VALUE
+                else:
+                    self._key = None
+            return
+        self._after_colon = False
+        if self._key is _KEY_NAME:
+            self._slot = -1
+            for slot in range(3):
+                if _token_is(token, length, _SLOT_NAMES[slot]):
+                    self._slot = slot
+                    break
+        elif self._key is _KEY_VALUE:
+            self._value = _to_int(token, length) if length <= _TOKEN_MAX else None
+        self._key = None
+
+    def _feed_json(self, buffer, n):
+        for i in range(n):
+            c = buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    self._push(c)
+                elif c == _BACKSLASH:
+                    self._escaped = True
+                elif c == _QUOTE:
+                    self._in_string = False
+                    self._end_token(True)
+                else:
+                    self._push(c)
+                continue
+            if self._bare:
+                if c == _COMMA or c == _CLOSE_BRACE or c <= 0x20 or c == _CLOSE_BRACKET:
+                    self._bare = False
+                    self._end_token(False)
+                else:
+                    self._push(c)
+                    continue
+            if c == _QUOTE:
+                self._in_string = True
+            elif c == _OPEN_BRACE or c == _OPEN_BRACKET:
+                self._depth += 1
+                self._key = None
+                self._after_colon = False
+                if self._depth == _ROW_DEPTH and c == _OPEN_BRACE:
+                    self._slot = -1
+                    self._value = None
+            elif c == _CLOSE_BRACE or c == _CLOSE_BRACKET:
+                self._depth -= 1
+                if self._depth == _ROW_DEPTH - 1 and c == _CLOSE_BRACE:
+                    self._store(self._slot, self._value)
+                    self._slot = -1
+                    self._value = None
+                    if self._found == 3:
+                        return
+            elif self._depth != _ROW_DEPTH:
+                pass  # Skipping a nested value
+            elif c == _COLON:
+                self._after_colon = True
+            elif c == _COMMA:
+                self._after_colon = False
+            elif c > 0x20 and self._after_colon:
+                self._bare = True  # Unquoted number, true, null, ...
+                self._push(c)
+
+    def _end_csv_field(self):
+        length = min(self._length, _TOKEN_MAX + 1)
+        if self._field < 3 and length:
+            value = _to_int(self._token, length) if length <= _TOKEN_MAX else None
+            self._store(self._field, value)
+        self._field += 1
+        self._length = 0
+
+    def _feed_csv(self, buffer, n):
+        for i in range(n):
+            c = buffer[i]
+            if c == _COMMA or c == _NEWLINE:
+                self._end_csv_field()
+                if c == _NEWLINE or self._found == 3:
+                    self._field = 3  # Only the first record carries metrics
+                    if self._found == 3:
+                        return
+            elif self._field < 3:
+                self._push(c)
@@ -0,0 +1,76 @@
+# ------------------------- Retry Policy & Circuit Breaker ---------------------
+# Failed requests are retried by the scheduler, not by sleeping or recursing:
+# a job hands back the breaker's retry delay as its next delay. Delays grow
+# exponentially with jitter so a fleet of devices does not retry in lockstep
+# after a backend outage, and an open breaker skips requests entirely while
+# the display keeps showing cached values.
+import time
+import random
+
+from blocktron import telemetry
+from blocktron.log import timed_print
+
+CLOSED = 0  # Requests flow normally
+OPEN = 1  # Requests are skipped until the retry time
+HALF_OPEN = 2  # One trial request is allowed through
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter: base * 2**attempt, capped, halved and jittered."""
+
+    def __init__(self, base=2, cap=600):
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt):
+        ceiling = min(self.cap, self.base * (1 << min(attempt, 16)))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class CircuitBreaker:
+    """Per-endpoint breaker that opens after failure_threshold consecutive failures."""
+
+    def __init__(self, name, policy, failure_threshold=3):
+        self.name = name
+        self.policy = policy
+        self.failure_threshold = failure_threshold
+        self.state = CLOSED
+        self.failures = 0  # Consecutive failures, drives the backoff
+        self.retry_at = 0.0
+        self.trips = 0  # Total times opened, for telemetry
+
+    def allow(self, now=None):
+        """True if a request may be sent now."""
+        if self.state != OPEN:
+            return True
+        if now is None:
+            now = time.monotonic()
+        if now < self.retry_at:
+            return False
+        self.state = HALF_OPEN
+        return True
+
+    def retry_in(self, now=None):
+        """Seconds until the next attempt should be made."""
+        if now is None:
+            now = time.monotonic()
+        return max(self.retry_at - now, 0.0)
+
+    def record_success(self):
+        if self.state != CLOSED:
+            timed_print(f"Circuit {self.name}: closed")
+        self.state = CLOSED
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def record_failure(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        self.failures += 1
+        self.retry_at = now + self.policy.delay(self.failures)
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+                telemetry.count(telemetry.BREAKER_TRIPS)
+            self.state = OPEN
+            timed_print(f"Circuit {self.name}: open, next try in {self.retry_at - now:.0f}s")
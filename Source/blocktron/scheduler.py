@@ -0,0 +1,111 @@
+# ------------------------- Task Scheduler -------------------------------------
+import time
+import asyncio
+
+from blocktron import log
+from blocktron.log import timed_print
+
+TASK_IDLE = -1  # Returned by a job to sleep until Scheduler.wake() is called
+
+
+class ScheduledTask:
+    """A periodic job plus the timing stats the scheduler keeps for it."""
+
+    def __init__(self, name, job, period, deadline, initial_delay):
+        self.name = name
+        self.job = job
+        self.period = period  # callable so cloud settings changes apply on the next run
+        self.deadline = deadline  # seconds after the due time by which a run should finish
+        self.initial_delay = initial_delay
+        self.wake_event = asyncio.Event()
+        self.runs = 0
+        self.run_total = 0.0
+        self.run_max = 0.0
+        self.late_total = 0.0
+        self.late_max = 0.0
+        self.missed = 0
+
+    def record(self, run_time, lateness):
+        self.runs += 1
+        self.run_total += run_time
+        self.late_total += lateness
+        if run_time > self.run_max:
+            self.run_max = run_time
+        if lateness > self.late_max:
+            self.late_max = lateness
+        if self.deadline is not None and lateness + run_time > self.deadline:
+            self.missed += 1
+
+
+class Scheduler:
+    """Runs each periodic job as its own asyncio task.
+
+    Every task sleeps exactly until its next due time, so the event loop only
+    wakes when something is due. A job returns None to run again after its
+    period, a number of seconds to override the next delay once, or TASK_IDLE
+    to sleep until woken.
+    """
+
+    def __init__(self, after_run=None):
+        self._tasks = {}
+        self._after_run = after_run  # called after every job, e.g. to push one display refresh
+
+    def add(self, name, job, period, deadline=None, initial_delay=0):
+        self._tasks[name] = ScheduledTask(name, job, period, deadline, initial_delay)
+
+    def wake(self, name):
+        self._tasks[name].wake_event.set()
+
+    async def _run_task(self, task):
+        due = time.monotonic() + task.initial_delay
+        while True:
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            start = time.monotonic()
+            try:
+                next_delay = task.job(start)
+            except Exception as e:
+                log.warn(f"Task {task.name} failed: {e}")
+                next_delay = None
+            if self._after_run is not None:
+                self._after_run()
+            end = time.monotonic()
+            task.record(end - start, max(start - due, 0.0))
+            if next_delay == TASK_IDLE:
+                await task.wake_event.wait()
+                task.wake_event.clear()
+                due = time.monotonic()
+                continue
+            if next_delay is None:
+                next_delay = task.period()
+            # Keep the task's phase, but never try to catch up on missed runs
+            due = max(due + next_delay, end)
+            await asyncio.sleep(0)
+
+    def report(self):
+        for task in self._tasks.values():
+            if not task.runs:
+                continue
+            timed_print(
+                f"Task {task.name}: runs={task.runs}"
+                f" run avg/max={task.run_total / task.runs * 1000:.1f}/{task.run_max * 1000:.1f}ms"
+                f" late avg/max={task.late_total / task.runs * 1000:.1f}/{task.late_max * 1000:.1f}ms"
+                f" missed={task.missed}"
+            )
+
+    def tasks(self):
+        return list(self._tasks.values())
+
+    async def _main(self):
+        await asyncio.gather(*(asyncio.create_task(self._run_task(t)) for t in self._tasks.values()))
+
+    def run(self, duration=None):
+        """Run the jobs forever, or return after duration seconds (used by benchmarks)."""
+        if duration is None:
+            asyncio.run(self._main())
+            return
+        try:
+            asyncio.run(asyncio.wait_for(self._main(), duration))
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,43 @@
+# ------------------------- Startup Timeline -----------------------------------
+# Boot happens in two stages. The display phases (MatrixPortal, cache, labels,
+# welcome screen, first frame) run in order before the scheduler starts. The
+# network phases (NTP, the first settings fetch and the first market poll) are
+# ordinary scheduler jobs, so they interleave with each other and with the
+# welcome screen, the ticker and the clock instead of holding up the panel.
+# Startup records when each phase began and ended, relative to the start of
+# code.py, and prints one breakdown once the last awaited phase is done.
+import time
+
+from blocktron.log import timed_print
+
+
+class Startup:
+    """Per-phase boot timings; report() runs when every awaited phase is recorded."""
+
+    def __init__(self, started, awaited=()):
+        self.started = started  # time.monotonic() at the top of code.py
+        self._phases = []  # (name, began, ended), seconds after started
+        self._awaited = list(awaited)
+        self.ready_at = None
+
+    def record(self, name, began, ended=None):
+        """Record phase name as running from began until ended (default: now); first call wins."""
+        if self.ready_at is not None or any(phase[0] == name for phase in self._phases):
+            return
+        if ended is None:
+            ended = time.monotonic()
+        self._phases.append((name, began - self.started, ended - self.started))
+        if name in self._awaited:
+            self._awaited.remove(name)
+            if not self._awaited:
+                self.ready_at = ended
+                self.report()
+
+    def report(self):
+        for name, began, ended in sorted(self._phases, key=lambda phase: phase[1]):
+            timed_print(
+                f"Boot: {name:<11} {began * 1000:6.0f} -> {ended * 1000:6.0f}ms"
+                f" ({(ended - began) * 1000:.0f}ms)"
+            )
+        if self.ready_at is not None:
+            timed_print(f"Boot: ready after {(self.ready_at - self.started) * 1000:.0f}ms")
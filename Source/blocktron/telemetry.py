@@ -0,0 +1,111 @@
+# ------------------------- Telemetry ------------------------------------------
+# Timing spans and counters for the hot paths. Every span keeps its last
+# WINDOW durations in one array allocated at import, and counters live in
+# another, so recording a sample only stores integers. Min/avg/max/p95 are
+# worked out when the numbers are dumped to serial or pushed with the
+# settings poll. Gauges hold the latest reading of a level, such as RSSI.
+import time
+from array import array
+
+from blocktron.log import timed_print
+
+WINDOW = 32  # Durations kept per span for the rolling statistics
+
+# Span ids index the sample arrays; SPAN_NAMES is in the same order
+FETCH_MARKET = 0
+PARSE_MARKET = 1
+FETCH_TICKER = 2
+FETCH_SETTINGS = 3
+SET_TEXT = 4
+REFRESH = 5
+GC = 6
+OTA_MANIFEST = 7
+OTA_DIFF = 8
+OTA_DOWNLOAD = 9
+WIFI_CONNECT = 10  # Time to get WiFi back after a drop
+SPAN_NAMES = (
+    "fetch_market", "parse_market", "fetch_ticker", "fetch_settings", "set_text",
+    "refresh", "gc", "ota_manifest", "ota_diff", "ota_download", "wifi_connect",
+)
+
+# Counter ids; COUNTER_NAMES is in the same order
+FAIL_MARKET = 0
+FAIL_TICKER = 1
+FAIL_SETTINGS = 2
+RETRIES = 3  # Requests sent while their endpoint had outstanding failures
+BREAKER_TRIPS = 4
+NOT_MODIFIED = 5  # 304 answers to conditional requests
+RECONNECTS = 6
+WIFI_RECONNECTS = 7
+WIFI_SCANS = 8  # Reconnects that fell back to a full scan
+DNS_LOOKUPS = 9  # Names actually resolved, rather than answered from saved addresses
+COUNTER_NAMES = (
+    "fail_market", "fail_ticker", "fail_settings", "retries", "breaker_trips",
+    "not_modified", "reconnects", "wifi_reconnects", "wifi_scans", "dns_lookups",
+)
+
+# Gauge ids; GAUGE_NAMES is in the same order
+RSSI = 0  # dBm of the access point, sampled with each settings poll and reconnect
+GAUGE_NAMES = ("rssi",)
+
+_samples = array("L", [0] * (WINDOW * len(SPAN_NAMES)))  # Microseconds, one ring per span
+_span_counts = array("L", [0] * len(SPAN_NAMES))
+_counters = array("L", [0] * len(COUNTER_NAMES))
+_gauges = array("l", [0] * len(GAUGE_NAMES))
+
+
+def start():
+    """Timestamp to hand to stop() when the span ends."""
+    return time.monotonic_ns()
+
+
+def stop(span, started):
+    """Record the time since started (from start()) as one sample of span."""
+    us = (time.monotonic_ns() - started) // 1000
+    n = _span_counts[span]
+    _samples[span * WINDOW + n % WINDOW] = us if us < 0xFFFFFFFF else 0xFFFFFFFF
+    _span_counts[span] = n + 1
+
+
+def count(counter, n=1):
+    _counters[counter] += n
+
+
+def gauge(gauge_id, value):
+    _gauges[gauge_id] = value
+
+
+def summary(span):
+    """(samples seen, min, avg, max, p95) in microseconds over the last WINDOW samples."""
+    n = _span_counts[span]
+    kept = min(n, WINDOW)
+    if not kept:
+        return n, 0, 0, 0, 0
+    window = sorted(_samples[span * WINDOW:span * WINDOW + kept])
+    p95 = window[min(kept * 95 // 100, kept - 1)]
+    return n, window[0], sum(window) // kept, window[-1], p95
+
+
+def compact():
+    """One-line form for the settings push: name:n:min:avg:max:p95 (us) per span, then counters and gauges."""
+    spans = ";".join(
+        SPAN_NAMES[span] + ":" + ":".join(str(v) for v in summary(span))
+        for span in range(len(SPAN_NAMES))
+        if _span_counts[span]
+    )
+    counters = ";".join(f"{name}:{_counters[i]}" for i, name in enumerate(COUNTER_NAMES))
+    gauges = ";".join(f"{name}:{_gauges[i]}" for i, name in enumerate(GAUGE_NAMES))
+    return f"2|{spans}|{counters}|{gauges}"
+
+
+def dump():
+    """Print every span that has samples, the counters and the gauges to serial."""
+    for span in range(len(SPAN_NAMES)):
+        n, low, avg, high, p95 = summary(span)
+        if n:
+            timed_print(
+                f"Span {SPAN_NAMES[span]}: n={n} min/avg/max/p95="
+                f"{low / 1000:.1f}/{avg / 1000:.1f}/{high / 1000:.1f}/{p95 / 1000:.1f}ms"
+            )
+    timed_print("Counters: " + " ".join(f"{name}={_counters[i]}" for i, name in enumerate(COUNTER_NAMES)))
+    timed_print("Gauges: " + " ".join(f"{name}={_gauges[i]}" for i, name in enumerate(GAUGE_NAMES)))
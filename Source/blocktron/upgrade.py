@@ -0,0 +1,157 @@
+# ------------------------- Upgrade Bridge -------------------------------------
+# 2.3.x only downloads code.py, boot.py and version_history.txt, so the first
+# boot after updating from it finds no blocktron package. code.py restarts in
+# download mode, fetches this module on its own and calls install(), which
+# fetches every file in the release's ota_manifest.json that is missing or
+# differs and stages it for boot.py's usual swap and verify.
+#
+# 2.4.0 also needs asyncio and adafruit_ticks, which 2.3.x didn't use. The
+# manifest lists their sources under "libraries", and a library is fetched only
+# when it is neither in lib (as a package, .py or .mpy) nor importable, e.g.
+# frozen into the firmware, so a bundle .mpy build is never shadowed. If the
+# import still fails with nothing left to fetch, the missing library has to be
+# copied over USB, and boot.py rolls back to the previous build after its
+# verify boots.
+#
+# Only the standard modules and libraries 2.3.x already had are used here; the
+# rest of the package may not be installed yet.
+import os
+import json
+import hashlib
+import binascii
+import microcontroller
+import storage
+import wifi
+import adafruit_connection_manager
+import adafruit_requests
+
+REPO_BASE = "https://raw.githubusercontent.com/GingerSherpa/BlockTron/main/Source"  # As ota.OTA_REPO_BASE
+STAGE_FILE = "/ota_stage.json"
+MAX_ATTEMPTS = 3  # Download attempts per verify boot, as ota.OTA_MAX_DOWNLOAD_ATTEMPTS
+
+
+def _sha256(path):
+    hasher = hashlib.new("sha256")
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(1024)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+    except OSError:
+        return None
+    return binascii.hexlify(hasher.digest()).decode()
+
+
+def _library_missing(module):
+    """True if module is neither in lib nor importable."""
+    for path in (f"/lib/{module}", f"/lib/{module}.py", f"/lib/{module}.mpy"):
+        try:
+            os.stat(path)
+            return False
+        except OSError:
+            pass
+    try:
+        __import__(module)
+    except ImportError:
+        return True
+    return False
+
+
+def _make_parents(name):
+    path = ""
+    for part in name.split("/")[:-1]:
+        path = f"{path}/{part}" if path else part
+        try:
+            os.mkdir(path)
+        except OSError:
+            pass  # Already there
+
+
+def _session():
+    """An HTTP session on the radio, joining WiFi first if needed."""
+    if not wifi.radio.connected:
+        wifi.radio.connect(os.getenv("CIRCUITPY_WIFI_SSID"), os.getenv("CIRCUITPY_WIFI_PASSWORD"))
+    return adafruit_requests.Session(
+        adafruit_connection_manager.get_radio_socketpool(wifi.radio),
+        adafruit_connection_manager.get_radio_ssl_context(wifi.radio),
+    )
+
+
+def _fetch(http, name, sha256):
+    """Download name from the release to name.new, checking its SHA-256."""
+    _make_parents(name)
+    hasher = hashlib.new("sha256")
+    resp = http.get(f"{REPO_BASE}/{name}", timeout=20)
+    try:
+        if resp.status_code != 200:
+            raise OSError(f"GET {name}: {resp.status_code}")
+        with open(name + ".new", "wb") as f:
+            for chunk in resp.iter_content(1024):
+                hasher.update(chunk)
+                f.write(chunk)
+    finally:
+        resp.close()
+    if binascii.hexlify(hasher.digest()).decode() != sha256:
+        os.remove(name + ".new")
+        raise OSError(f"{name}: hash mismatch")
+
+
+def install(error):
+    """Stage the files code.py needs and reboot into boot.py's swap; runs in download mode."""
+    nvm = microcontroller.nvm
+    storage.remount("/", False)
+    try:
+        http = _session()
+        resp = http.get(f"{REPO_BASE}/ota_manifest.json", timeout=20)
+        try:
+            release = resp.json()
+        finally:
+            resp.close()
+        manifest = release["files"]
+        targets = [name for name, expected in manifest.items() if _sha256(name) != expected["sha256"]]
+        missing = {}  # Library module -> whether it has to be fetched
+        for name, expected in release.get("libraries", {}).items():
+            module = name.split("/")[1].split(".")[0]  # lib/asyncio/core.py -> asyncio
+            if module not in missing:
+                missing[module] = _library_missing(module)
+            if missing[module]:
+                manifest[name] = expected
+                targets.append(name)
+        if not targets:
+            # Every file is installed, so a library the release doesn't ship is missing from lib; retrying won't help
+            print(f"Upgrade: {error}; copy the library into lib over USB")
+            nvm[0] = 2  # boot.py rolls back to the previous build after its verify boots
+            return
+        print("Upgrade: fetching", targets)
+        for name in targets:
+            _fetch(http, name, manifest[name]["sha256"])
+        # Keep the files 2.3.x staged, so a rollback still restores its code.py and boot.py
+        try:
+            with open(STAGE_FILE, "r") as f:
+                staged = json.load(f).get("files", [])
+        except (OSError, ValueError):
+            staged = []
+        with open(STAGE_FILE, "w") as f:
+            json.dump({"files": staged + [name for name in targets if name not in staged]}, f)
+        nvm[2] = 0
+        nvm[0] = 3  # boot.py swaps the .new files in and starts verifying
+    except Exception as e:
+        _failed(e)
+    finally:
+        storage.remount("/", True)
+        microcontroller.reset()
+
+
+def _failed(e):
+    """Count a failed download; after MAX_ATTEMPTS, leave it to boot.py's rollback."""
+    nvm = microcontroller.nvm
+    attempts = nvm[2] + 1
+    print(f"Upgrade failed ({attempts}/{MAX_ATTEMPTS}):", e)
+    if attempts < MAX_ATTEMPTS:
+        nvm[2] = attempts  # Stay in download mode and try again after the reset
+    else:
+        # Back to verifying the build the update installed; boot.py rolls it back after its verify boots
+        nvm[2] = 0
+        nvm[0] = 2
@@ -0,0 +1,114 @@
+# ------------------------- Welcome Screen -------------------------------------
+# The "scan to replace presets" QR code shown after a normal boot. It used to
+# be drawn by boot.py on a MatrixPortal of its own, followed by a 10 second
+# sleep; now it borrows the display app.py already set up and stays on the
+# panel while WiFi, NTP and the settings fetch run. The regular labels are
+# painted underneath in the meantime, and close() hands the panel back to them
+# as soon as startup is done, after WELCOME_MIN_SECONDS at the least and
+# WELCOME_MAX_SECONDS at the most.
+#
+# The QR code only depends on the device ID, so it is encoded once and kept
+# in NVM as a packed 1-bit bitmap, keyed by a CRC32 of the URL. Later boots
+# read it into the displayio.Bitmap with a single bitmaptools.readinto call
+# and never import adafruit_miniqr; a new device_keys.json changes the URL
+# and so the key, and the code is encoded again.
+import io
+import struct
+import binascii
+import displayio
+import bitmaptools
+import microcontroller
+from adafruit_display_text.label import Label
+
+from blocktron import cache
+from blocktron import fonts
+from blocktron.log import timed_print
+
+WELCOME_MIN_SECONDS = 2  # Shortest time the QR code is up, so it can still be scanned
+WELCOME_MAX_SECONDS = 10  # Closed by then even if a startup phase is still running
+WELCOME_CHECK_INTERVAL = 0.25  # How often app.py's welcome job looks at the startup phases
+WELCOME_URL = "https://set.blocktron.io?dev_id="
+WELCOME_COLOR = 0xFF4500
+WELCOME_FONT = "/fonts/4x6-lean.bdf"
+WELCOME_LINES = (("WELCOME", 4), ("SCAN TO", 12), ("REPLACE", 18), ("PRESETS", 25))  # (text, y)
+QR_SIZE = 32
+QR_POSITION = (34, 1)
+QR_ROW_BYTES = (QR_SIZE + 7) // 8
+QR_NVM_OFFSET = cache.CACHE_NVM_END  # nvm[5888:6144]; the persisted log starts right after
+_QR_HEADER = "<4sI"  # magic, CRC32 of the URL the rows encode
+_QR_HEADER_SIZE = struct.calcsize(_QR_HEADER)
+_QR_MAGIC = b"BTQ1"
+
+
+def encode_qr_rows(data_url):
+    """Encode data_url and pack it into QR_SIZE rows of 1-bit pixels, MSB first."""
+    import adafruit_miniqr  # Only needed when the stored code is missing or stale
+
+    qr = adafruit_miniqr.QRCode()
+    qr.add_data(data_url.encode())
+    qr.make()
+    code_size = min(qr.matrix.width, QR_SIZE)
+    rows = bytearray(QR_SIZE * QR_ROW_BYTES)
+    for y in range(code_size):
+        for x in range(code_size):
+            if qr.matrix[x, y]:
+                rows[y * QR_ROW_BYTES + x // 8] |= 0x80 >> (x % 8)
+    return rows
+
+
+def load_qr_rows(data_url):
+    """Packed rows for data_url from NVM, encoding and storing them first if needed."""
+    nvm = microcontroller.nvm
+    key = binascii.crc32(data_url.encode())
+    start = QR_NVM_OFFSET + _QR_HEADER_SIZE
+    end = start + QR_SIZE * QR_ROW_BYTES
+    magic, stored_key = struct.unpack(_QR_HEADER, nvm[QR_NVM_OFFSET:start])
+    if magic == _QR_MAGIC and stored_key == key:
+        return nvm[start:end]
+    rows = encode_qr_rows(data_url)
+    nvm[QR_NVM_OFFSET:end] = struct.pack(_QR_HEADER, _QR_MAGIC, key) + rows
+    timed_print("Welcome: QR code encoded and stored in NVM")
+    return rows
+
+
+class WelcomeScreen:
+    """Shows the welcome text and QR code as the display's root group until close()."""
+
+    def __init__(self, screen, device_id, now):
+        self._screen = screen
+        self._display = screen.portal.graphics.display
+        self._previous_group = self._display.root_group
+        group = displayio.Group()
+        font = fonts.load_font(WELCOME_FONT)  # Same font object as the status label
+        for text, y in WELCOME_LINES:
+            group.append(Label(font, text=text, color=WELCOME_COLOR, x=3, y=y))
+        palette = displayio.Palette(2)
+        palette[0] = 0x000000
+        palette[1] = 0xFFFFFF
+        bitmap = displayio.Bitmap(QR_SIZE, QR_SIZE, 2)
+        bitmaptools.readinto(
+            bitmap, io.BytesIO(load_qr_rows(f"{WELCOME_URL}{device_id}")),
+            bits_per_pixel=1, element_size=1, reverse_pixels_in_element=True,
+        )
+        group.append(displayio.TileGrid(bitmap, pixel_shader=palette, x=QR_POSITION[0], y=QR_POSITION[1]))
+        self._group = group
+        self.shown_at = now
+        self._display.root_group = group
+        screen.mark_dirty()
+
+    @property
+    def showing(self):
+        return self._group is not None
+
+    def time_left(self, now, ready):
+        """Seconds until close() is due; ready says whether every startup phase has finished."""
+        limit = WELCOME_MIN_SECONDS if ready else WELCOME_MAX_SECONDS
+        return self.shown_at + limit - now
+
+    def close(self):
+        """Put the regular labels back on the panel and drop the welcome group."""
+        if self._group is None:
+            return
+        self._display.root_group = self._previous_group
+        self._group = None
+        self._screen.mark_dirty()
@@ -1,10 +1,10 @@
-# boot.py — 2.3.1
+# boot.py — 2.4.0
 
 import microcontroller, storage
 if microcontroller.nvm[0] in (1, 3):  # 1=download, 3=swap
     storage.disable_usb_drive()
 
-import os, time, json, microcontroller, storage
+import os, json, microcontroller, storage
 
 # ----- OTA constants -----
 _STAGE_FILE = "/ota_stage.json"
@@ -48,6 +48,16 @@ def _swap_in_new_files(files):
             if _exists(fn):
                 os.rename(fn, bakf)
             os.rename(newf, fn)
+            if fn.endswith(".mpy"):
+                # a .py next to the .mpy is imported first; move it aside
+                src = fn[:-4] + ".py"
+                if _exists(src):
+                    try:
+                        if _exists(src + ".bak"):
+                            os.remove(src + ".bak")
+                    except OSError:
+                        pass
+                    os.rename(src, src + ".bak")
     finally:
         storage.remount("/", True)
 
@@ -57,6 +67,14 @@ def _restore_from_backup(files):
     try:
         for fn in files:
             bakf = fn + ".bak"
+            if fn.endswith(".mpy") and _exists(fn[:-4] + ".py.bak"):
+                # restore the source module the .mpy replaced
+                src = fn[:-4] + ".py"
+                if _exists(src):
+                    os.remove(src)
+                os.rename(src + ".bak", src)
+                if not _exists(bakf) and _exists(fn):
+                    os.remove(fn)
             if _exists(bakf):
                 try:
                     if _exists(fn):
@@ -102,47 +120,5 @@ elif flag == 2:
             nvm[0] = 0
             nvm[1] = 0
 
-# ---------- Original welcome QR screen (shown only in normal mode) ----------
-if nvm[0] == 0:  # normal
-    import displayio
-    from adafruit_matrixportal.matrixportal import MatrixPortal
-    import adafruit_miniqr
-
-    DEVICE_KEYS_FILE = "/device_keys.json"
-    BASE_SETTINGS_URL = "https://set.blocktron.io?dev_id="
-    device_id = "UNKNOWN_DEVICE"
-
-    matrixportal = MatrixPortal(width=64, height=32, color_order="RGB", debug=False)
-
-    matrixportal.add_text(text_position=(3, 4),  text_color=0xFF4500, text_font="/fonts/4x6-lean.bdf", text="WELCOME")
-    matrixportal.add_text(text_position=(3, 12), text_color=0xFF4500, text_font="/fonts/4x6-lean.bdf", text="SCAN TO")
-    matrixportal.add_text(text_position=(3, 18), text_color=0xFF4500, text_font="/fonts/4x6-lean.bdf", text="REPLACE")
-    matrixportal.add_text(text_position=(3, 25), text_color=0xFF4500, text_font="/fonts/4x6-lean.bdf", text="PRESETS")
-
-    try:
-        with open(DEVICE_KEYS_FILE, "r") as f:
-            device_id = (json.load(f)).get("deviceId", device_id)
-    except Exception:
-        pass
-
-    url = f"{BASE_SETTINGS_URL}{device_id}"
-
-    import displayio
-    palette = displayio.Palette(2)
-    palette[0] = 0x000000
-    palette[1] = 0xFFFFFF
-    bitmap = displayio.Bitmap(32, 32, 2)
-    tile_grid = displayio.TileGrid(bitmap, pixel_shader=palette, x=34, y=1)
-    matrixportal.splash.append(tile_grid)
-
-    def draw_qr_code(bm, data_url):
-        qr = adafruit_miniqr.QRCode()
-        qr.add_data(data_url.encode())
-        qr.make()
-        code_size = min(qr.matrix.width, 32)
-        for y in range(code_size):
-            for x in range(code_size):
-                bm[x, y] = 1 if qr.matrix[x, y] else 0
-
-    draw_qr_code(bitmap, url)
-    time.sleep(10)
\ No newline at end of file
+# The welcome QR screen is drawn by code.py (blocktron/welcome.py) while it
+# connects, so a normal boot leaves here straight away.
@@ -0,0 +1,247 @@
+"""Benchmark the BlockTron firmware and compare the results with a stored baseline.
+
+The scenarios live in device_bench.py and run the same way on the MatrixPortal
+and in the simulator: first frame after boot, fetch_data_from_api and
+fetch_ticker_data time and allocations, main-loop run/late times, ticker frame
+pacing and OTA download throughput. Each run ends with one "BENCH {...}" line.
+
+    python Tools/benchmark/bench.py run                     # simulator, compare with baseline.json
+    python Tools/benchmark/bench.py run --update-baseline   # accept the current numbers
+    python Tools/benchmark/bench.py baseline a.json b.json c.json  # median of several runs
+    python Tools/benchmark/bench.py serve --port 8765       # API stub for a device on the LAN
+    python Tools/benchmark/bench.py compare serial.log      # check a device run
+
+compare and run exit with status 1 when a metric is worse than its baseline by
+more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.dirname(BENCH_DIR)
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from simulator import state  # noqa: E402
+from simulator.api_stub import ApiStub  # noqa: E402
+from simulator.run import SOURCE_DIR, Simulation  # noqa: E402
+
+DEVICE_SCRIPT = os.path.join(BENCH_DIR, "device_bench.py")
+DRIVE_SCRIPT = "bench_code.py"  # Name of device_bench.py on the simulated drive
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+REPORT_PREFIX = "BENCH "
+
+HIGHER_IS_BETTER = ("ota_kbps", "scroll_frames")
+IGNORED = ("ota_bytes", "ota_to_flash")  # Reported for context, not compared
+# (name suffix, relative tolerance, absolute slack); the first match wins. Sized
+# to the spread of 10 simulator runs of one tree: p50s, averages and boot times
+# moved by up to ~10% (0.4ms on the fetches), allocations by 20 bytes. Maxima
+# and p95s come from a handful of samples and one GC or scheduler hiccup moves
+# them by up to 30ms (6ms for a fetch p95), so their slack only catches gross
+# regressions; the p50s and averages are the real gate.
+TOLERANCES = (
+    ("_ms_max", 0.15, 35.0),
+    ("_ms_p95", 0.15, 8.0),
+    ("_ms", 0.15, 0.5),  # p50s, averages and boot times
+    ("_bytes", 0.05, 64),
+    ("_missed", 0.0, 1),
+    ("_kbps", 0.15, 0),
+    ("_frames", 0.01, 1),
+)
+DEFAULT_TOLERANCE = (0.15, 0)
+
+
+def _usb_drive_off(sim):
+    """Boot the benchmark with the USB drive off, as for an OTA download, so it can write to flash."""
+    state.usb_drive_enabled = False
+
+
+def run_simulator(duration, latency):
+    """Run device_bench.py in the simulator; returns its report."""
+    sim = Simulation(latency=latency, heap=True)
+    shutil.copy(DEVICE_SCRIPT, os.path.join(sim.drive, DRIVE_SCRIPT))
+    first_frame = []
+
+    def on_refresh(display):
+        if not first_frame and sim.code_started is not None:
+            first_frame.append(time.monotonic())
+
+    state.refresh_hooks.append(on_refresh)
+    try:
+        outcome = sim.run(duration, max_boots=1, before_code=_usb_drive_off, script=DRIVE_SCRIPT)
+        namespace = sim.importer.namespace or {}
+    finally:
+        sim.close()
+        shutil.rmtree(sim.work_dir, ignore_errors=True)
+    report = namespace.get("report")
+    if outcome != "exited" or report is None:
+        raise SystemExit(f"benchmark did not finish in the simulator (outcome: {outcome})")
+    if first_frame:
+        # Includes boot.py, which the on-device number can't see
+        report["metrics"]["boot_first_frame_ms"] = round((first_frame[0] - sim.boot_started) * 1000, 1)
+    return report
+
+
+def load_report(path):
+    """Read a report from a JSON file or from the BENCH line of a serial log."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    for line in reversed(text.splitlines()):
+        start = line.find(REPORT_PREFIX + "{")
+        if start >= 0:
+            return json.loads(line[start + len(REPORT_PREFIX):])
+    return json.loads(text)
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {"version": 1, "targets": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_baseline(path, baseline, report):
+    baseline["targets"][report["target"]] = report["metrics"]
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Baseline for {report['target']} written to {path}")
+
+
+def median_report(reports):
+    """One report whose metrics are the per-metric medians of reports, for a steadier baseline."""
+    metrics = {}
+    for name in reports[0]["metrics"]:
+        values = sorted(report["metrics"][name] for report in reports if name in report["metrics"])
+        metrics[name] = values[len(values) // 2]
+    return {"target": reports[0]["target"], "metrics": metrics}
+
+
+def tolerance_for(name, relative=None):
+    """(relative tolerance, absolute slack) for a metric; relative overrides the table's."""
+    for suffix, table_relative, slack in TOLERANCES:
+        if suffix in name:
+            break
+    else:
+        table_relative, slack = DEFAULT_TOLERANCE
+    return (table_relative if relative is None else relative), slack
+
+
+def compare(metrics, baseline, relative=None):
+    """Returns (name, baseline, current, regressed) for every metric in both."""
+    rows = []
+    for name in sorted(set(metrics) & set(baseline)):
+        if name in IGNORED:
+            continue
+        base, current = baseline[name], metrics[name]
+        tolerance, slack = tolerance_for(name, relative)
+        if name in HIGHER_IS_BETTER:
+            regressed = current < base * (1 - tolerance) - slack
+        else:
+            regressed = current > base * (1 + tolerance) + slack
+        rows.append((name, base, current, regressed))
+    return rows
+
+
+def check(report, baseline_path, relative=None):
+    """Print the comparison table; returns the exit status."""
+    baseline = load_baseline(baseline_path).get("targets", {}).get(report["target"])
+    if baseline is None:
+        # Only the simulator baseline is committed; a device run is skipped until one is stored
+        print(f"No {report['target']} baseline in {baseline_path}; rerun with --update-baseline")
+        return 0
+    rows = compare(report["metrics"], baseline, relative)
+    for name, base, current, regressed in rows:
+        print(f"{'REGRESSED' if regressed else 'ok':>9}  {name:<24} {base:>12} -> {current}")
+    regressions = [row[0] for row in rows if row[3]]
+    missing = sorted(set(baseline) - set(report["metrics"]))
+    if missing:
+        print(f"Missing from this run: {', '.join(missing)}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond tolerance: {', '.join(regressions)}")
+        return 1
+    print("No regressions beyond tolerance")
+    return 0
+
+
+def _lan_address():
+    """Address other hosts on the LAN reach this one at (no packets are sent)."""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.connect(("10.255.255.255", 1))
+        return probe.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        probe.close()
+
+
+def serve(port, latency):
+    stub = ApiStub(SOURCE_DIR, latency=latency, address=("0.0.0.0", port)).start()
+    print(f'Add to the device\'s settings.toml:\nBENCH_API_BASE = "http://{_lan_address()}:{stub.port}"')
+    print("Serving the API stub and Source/ as the OTA host; Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"stub requests: {stub.requests}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the scenarios in the simulator")
+    run_parser.add_argument("--duration", type=float, default=120, help="give up after this many seconds")
+    run_parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every stub response")
+    run_parser.add_argument("--out", help="also write the report to this JSON file")
+
+    serve_parser = commands.add_parser("serve", help="serve the API stub to a device on the LAN")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every stub response")
+
+    compare_parser = commands.add_parser("compare", help="compare a saved report or serial log")
+    compare_parser.add_argument("report", help="JSON report, or a serial log with a BENCH line")
+
+    baseline_parser = commands.add_parser("baseline", help="store the median of saved reports as the baseline")
+    baseline_parser.add_argument("reports", nargs="+", help="JSON reports written by run --out")
+    baseline_parser.add_argument("--baseline", default=BASELINE_PATH)
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--baseline", default=BASELINE_PATH)
+        sub.add_argument("--tolerance", type=float, help="allowed relative change for every metric (default: per metric)")
+        sub.add_argument("--update-baseline", action="store_true", help="store this report as the baseline")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve(args.port, args.latency)
+    if args.command == "baseline":
+        report = median_report([load_report(path) for path in args.reports])
+        save_baseline(args.baseline, load_baseline(args.baseline), report)
+        return 0
+    if args.command == "run":
+        report = run_simulator(args.duration, args.latency)
+        print(REPORT_PREFIX + json.dumps(report))
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        report = load_report(args.report)
+    if args.update_baseline:
+        save_baseline(args.baseline, load_baseline(args.baseline), report)
+        return 0
+    return check(report, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+# ------------------------- BlockTron Benchmark Scenarios ----------------------
+# Runs on the MatrixPortal or in the simulator and prints one "BENCH {...}"
+# line with the results. On the device: copy this file to CIRCUITPY as code.py
+# next to the installed firmware, start `python Tools/benchmark/bench.py serve`
+# on a host in the same network and put the BENCH_API_BASE line it prints into
+# settings.toml. Every API and OTA request then goes to that host's API stub.
+# Save the serial output and check it with `bench.py compare`.
+#
+# What is real and what is not: the fetches, parsers, display classes, the
+# Scheduler, link.Link and ota._download_to_temp are the installed blocktron
+# modules. blocktron.app itself can't be driven from here (run() sets up and
+# enters its loop without returning), so the boot steps and the
+# market/ticker/scroll/clock jobs below are reduced copies of it. The numbers don't cover what those copies
+# leave out: cache writes and stale marking, the live feed, the settings, OTA,
+# log and watchdog jobs, and the welcome screen's timing. The OTA download is
+# only written to flash when the drive can be remounted read-write, i.e. when
+# the board booted with the USB drive off; otherwise it is streamed and hashed
+# without writing, and ota_to_flash is 0.
+import time
+
+script_start_ns = time.monotonic_ns()
+
+import gc
+import os
+import json
+import hashlib
+import board
+import wifi
+import storage
+from adafruit_matrixportal.matrixportal import MatrixPortal
+
+from blocktron import config
+from blocktron import net
+from blocktron import api
+from blocktron import ota
+from blocktron import display
+from blocktron import cache
+from blocktron import log
+from blocktron.log import timed_print
+from blocktron.scheduler import Scheduler, TASK_IDLE
+from blocktron.clock import Clock
+from blocktron.link import Link
+from blocktron.welcome import WelcomeScreen
+
+FETCH_RUNS = 10  # Back-to-back polls per endpoint
+LOOP_SECONDS = 20  # Length of the main-loop scenario
+LOOP_MARKET_INTERVAL = 2  # Poll far more often than the firmware does, to load the loop
+BENCH_TICKER_SPEED = 0.04  # Frame delay used for the pacing measurement
+BENCH_OTA_NAME = "/bench_ota"  # Written as .part/.new by the real download, then removed
+
+report = {"version": 1, "target": "simulator" if "simulator" in os.uname().version else "device"}
+metrics = {}
+report["metrics"] = metrics
+
+
+def elapsed_ms(start_ns):
+    return (time.monotonic_ns() - start_ns) / 1_000_000
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(prefix, values):
+    metrics[prefix + "_p50"] = round(percentile(values, 0.5), 3)
+    metrics[prefix + "_p95"] = round(percentile(values, 0.95), 3)
+    metrics[prefix + "_max"] = round(max(values) if values else 0.0, 3)
+
+
+def measure(func):
+    """Run func once; returns (result, milliseconds, bytes allocated).
+
+    MicroPython only hands memory back on collection, so the mem_alloc() delta
+    after a collect counts everything the call allocated.
+    """
+    gc.collect()
+    before = gc.mem_alloc()
+    start = time.monotonic_ns()
+    result = func()
+    ms = elapsed_ms(start)
+    return result, ms, gc.mem_alloc() - before
+
+
+def via_stub(url):
+    """Point url at the benchmark host: https://host/path -> BENCH_API_BASE/host/path."""
+    return f"{api_base}/{url.split('://', 1)[1]}"
+
+
+api_base = os.getenv("BENCH_API_BASE")
+if api_base:
+    api_base = api_base.rstrip("/")
+    config.api_current_base_url = via_stub(config.api_current_base_url)
+    config.api_current_ticker_url = via_stub(config.api_current_ticker_url)
+    config.api_current_settings_url = via_stub(config.api_current_settings_url)
+    ota.OTA_REPO_BASE = via_stub(ota.OTA_REPO_BASE)
+    ota.OTA_MANIFEST_URL = via_stub(ota.OTA_MANIFEST_URL)
+config.DEVICE_LOGGING_ENABLED = False  # Keep serial output out of the timings
+
+# ------------------------- Boot to First Frame --------------------------------
+# Same steps app.run() takes before its first refresh
+matrixportal = MatrixPortal(
+    status_neopixel=board.NEOPIXEL, bit_depth=4, width=64, height=32, color_order="RGB", debug=False
+)
+if cache.load():
+    cached_settings = cache.value("settings")
+    if cached_settings:
+        config.apply_cloud_settings(cached_settings)
+display.setup_labels(matrixportal)
+screen = display.Screen(matrixportal)
+ticker_scroller = display.TickerScroller(
+    matrixportal,
+    display.TICKER_FONT,
+    display.TICKER_POSITION,
+    display.dimmed_color(display.TICKER_TEXT_INDEX, screen.dim_level),
+)
+screen.scroller = ticker_scroller
+api.load_device_keys()
+welcome = WelcomeScreen(screen, config.device_id, time.monotonic())
+screen.set_text(f"{cache.value('price') or 0}", display.PRICE_TEXT_INDEX)
+screen.set_text(f"{cache.value('height') or 0}", display.BLOCKHEIGHT_TEXT_INDEX)
+screen.mark_dirty()
+screen.flush()
+metrics["first_frame_ms"] = round(elapsed_ms(script_start_ns), 1)
+
+wifi_link = Link(wifi.radio, matrixportal.network.connect)
+net.init(wifi.radio, connect=wifi_link.connect, link=wifi_link)
+api.fetch_cloud_settings()
+welcome.close()
+
+# ------------------------- Fetch and Parse ------------------------------------
+for name, fetch in (("fetch_market", api.fetch_data_from_api), ("fetch_ticker", api.fetch_ticker_data)):
+    times = []
+    allocs = []
+    for _ in range(FETCH_RUNS):
+        result, ms, allocated = measure(fetch)
+        if name == "fetch_market" and None in result:
+            raise RuntimeError(f"fetch_data_from_api returned {result}")  # A parse miss would time the wrong path
+        times.append(ms)
+        allocs.append(allocated)
+    summarize(name + "_ms", times)
+    # The first poll of each runs off the settings fetch's warm-up and isn't typical; average the rest
+    metrics[name + "_alloc_bytes"] = sum(allocs[1:]) // max(len(allocs) - 1, 1)
+
+# ------------------------- Main Loop and Scroll Pacing ------------------------
+frame_starts = []
+
+
+def market_job(now):
+    price, height, _ = api.fetch_data_from_api()
+    if price is not None:
+        screen.set_text(f"{price}", display.PRICE_TEXT_INDEX)
+        screen.set_text(f"{height}", display.BLOCKHEIGHT_TEXT_INDEX)
+
+
+def ticker_job(now):
+    message = api.fetch_ticker_data() or ticker_scroller.message or "BENCH"
+    ticker_scroller.set_message(message)
+    ticker_scroller.start(time.monotonic())
+    screen.mark_dirty()
+    scheduler.wake("scroll")
+
+
+def scroll_job(now):
+    if not ticker_scroller.active:
+        return TASK_IDLE
+    frame_starts.append(now)
+    screen.mark_dirty()
+    if ticker_scroller.step(now, BENCH_TICKER_SPEED):
+        ticker_scroller.start(time.monotonic())  # Keep scrolling for the whole scenario
+    return None
+
+
+wall_clock = Clock()
+wall_clock.resync()
+
+
+def clock_job(now):
+    if not ticker_scroller.active:
+        display.update_time_display(screen, wall_clock.hhmm(now))
+    return wall_clock.until_next_minute(now)
+
+
+scheduler = Scheduler(after_run=screen.flush)
+scheduler.add("market", market_job, lambda: LOOP_MARKET_INTERVAL, deadline=5)
+scheduler.add("ticker", ticker_job, lambda: LOOP_SECONDS, deadline=10)
+scheduler.add("scroll", scroll_job, lambda: BENCH_TICKER_SPEED, deadline=0.1)
+scheduler.add("clock", clock_job, lambda: 5, deadline=1)
+scheduler.run(LOOP_SECONDS)
+
+runs = sum(task.runs for task in scheduler.tasks())
+if runs:
+    metrics["loop_run_ms_avg"] = round(sum(t.run_total for t in scheduler.tasks()) / runs * 1000, 3)
+    metrics["loop_late_ms_avg"] = round(sum(t.late_total for t in scheduler.tasks()) / runs * 1000, 3)
+metrics["loop_run_ms_max"] = round(max(t.run_max for t in scheduler.tasks()) * 1000, 3)
+metrics["loop_late_ms_max"] = round(max(t.late_max for t in scheduler.tasks()) * 1000, 3)
+metrics["loop_missed"] = sum(t.missed for t in scheduler.tasks())
+
+intervals = [(b - a) * 1000 for a, b in zip(frame_starts, frame_starts[1:])]
+if intervals:
+    metrics["scroll_frame_ms_avg"] = round(sum(intervals) / len(intervals), 3)
+    jitter = [abs(i - BENCH_TICKER_SPEED * 1000) for i in intervals]
+    metrics["scroll_jitter_ms_p95"] = round(percentile(jitter, 0.95), 3)
+    metrics["scroll_jitter_ms_max"] = round(max(jitter), 3)
+metrics["scroll_frames"] = len(frame_starts)
+
+# ------------------------- OTA Download Throughput ----------------------------
+# The largest file in the manifest, through ota._download_to_temp when the
+# drive is writable. With the USB drive mounted code.py can't write, so it is
+# only streamed through the OTA buffer and hash.
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def stream_without_writing(url):
+    hasher = hashlib.new("sha256")
+    view = memoryview(ota._ota_buffer)
+    received = 0
+    resp = ota._http_get(url, timeout=20)
+    try:
+        readinto = net.body_reader(resp, ota._ota_buffer)
+        while True:
+            n = readinto(ota._ota_buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+            received += n
+    finally:
+        resp.close()
+    return received
+
+
+manifest = ota._fetch_manifest()
+if manifest:
+    name = max(manifest, key=lambda n: manifest[n]["size"])
+    url = f"{ota.OTA_REPO_BASE}/{name}"
+    try:
+        storage.remount("/", False)
+        writable = True
+    except RuntimeError:
+        writable = False
+    start = time.monotonic_ns()
+    if writable:
+        received = manifest[name]["size"] if ota._download_to_temp(BENCH_OTA_NAME, url, manifest[name]) else 0
+    else:
+        received = stream_without_writing(url)
+    seconds = max(elapsed_ms(start) / 1000, 0.001)
+    if writable:
+        for suffix in (".part", ".new"):
+            remove_quietly(BENCH_OTA_NAME + suffix)
+        storage.remount("/", True)
+    metrics["ota_to_flash"] = int(writable)
+    metrics["ota_bytes"] = received
+    metrics["ota_kbps"] = round(received / 1024 / seconds, 1)
+
+config.DEVICE_LOGGING_ENABLED = True
+print("BENCH " + json.dumps(report))
+timed_print("Benchmark done")
+log.drain()
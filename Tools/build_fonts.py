@@ -0,0 +1,119 @@
+"""Convert the BDF fonts in Source/fonts to subset .btf glyph caches.
+
+Parsing BDF text on the device is slow and loads glyphs no label draws. A .btf
+file holds only the subset below in a binary layout that blocktron.fonts
+reads lazily, one glyph at a time, with bitmaptools.readinto:
+
+    header  "<4sH6h"     magic b"BTF1", glyph count, bounding box (w, h, x, y),
+                         ascent, descent
+    index   "<HBBbbbxI"  per glyph, sorted by code point: code point, width,
+                         height, dx, dy, shift_x, bitmap offset
+    bitmaps              rows MSB-first, each row padded to a whole byte
+
+Run from the repo root after changing a font or a subset, then regenerate the
+OTA manifest:
+
+    python Tools/build_fonts.py
+"""
+
+import os
+import struct
+
+FONT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Source", "fonts"))
+
+HEADER = struct.Struct("<4sH6h")
+INDEX_ENTRY = struct.Struct("<HBBbbbxI")
+MAGIC = b"BTF1"
+
+PRINTABLE_LATIN_1 = "".join(chr(c) for c in range(32, 127)) + "".join(chr(c) for c in range(160, 256))
+
+# Glyphs each font must carry, by the labels that use it; None keeps every
+# glyph the BDF has. Fonts that draw cloud-configured or ticker text keep them
+# all (Arial-Bold-12 also covers Latin Extended-A, U+0100-U+017E), since any of
+# them can arrive. None of the BDFs has a glyph for €.
+SUBSETS = {
+    # price ("Price Err", digits) and conf_device_boot_text_top
+    "Arial-Bold-12.bdf": None,
+    # block height, Moscow time, clock, conf_device_boot_text_bottom and the ticker
+    "5x8-lean.bdf": None,
+    # status pixel and the welcome screen
+    "4x6-lean.bdf": PRINTABLE_LATIN_1,
+}
+
+
+def parse_bdf(path):
+    """Return (bounding box, ascent, descent, {code point: glyph dict})."""
+    glyphs = {}
+    bbox = (0, 0, 0, 0)
+    ascent = descent = 0
+    glyph = None
+    bitmap_rows = None
+    with open(path, "r", encoding="latin-1") as f:
+        for line in f:
+            fields = line.split()
+            if not fields:
+                continue
+            key = fields[0]
+            if bitmap_rows is not None:
+                if key == "ENDCHAR":
+                    glyph["rows"] = bitmap_rows
+                    if glyph["code"] >= 0:
+                        glyphs[glyph["code"]] = glyph
+                    glyph = bitmap_rows = None
+                else:
+                    bitmap_rows.append(bytes.fromhex(key))
+            elif key == "FONTBOUNDINGBOX":
+                bbox = tuple(int(v) for v in fields[1:5])
+            elif key == "FONT_ASCENT":
+                ascent = int(fields[1])
+            elif key == "FONT_DESCENT":
+                descent = int(fields[1])
+            elif key == "STARTCHAR":
+                glyph = {"code": -1, "shift_x": 0}
+            elif key == "ENCODING":
+                glyph["code"] = int(fields[1])
+            elif key == "DWIDTH":
+                glyph["shift_x"] = int(fields[1])
+            elif key == "BBX":
+                glyph["width"], glyph["height"], glyph["dx"], glyph["dy"] = (int(v) for v in fields[1:5])
+            elif key == "BITMAP":
+                bitmap_rows = []
+    return bbox, ascent, descent, glyphs
+
+
+def build_btf(bdf_path, charset):
+    bbox, ascent, descent, glyphs = parse_bdf(bdf_path)
+    if charset is None:
+        wanted = sorted(glyphs)
+    else:
+        wanted = sorted(code for code in {ord(ch) for ch in charset} if code in glyphs)
+    index = bytearray()
+    bitmaps = bytearray()
+    data_start = HEADER.size + INDEX_ENTRY.size * len(wanted)
+    for code in wanted:
+        glyph = glyphs[code]
+        row_bytes = (glyph["width"] + 7) // 8
+        index += INDEX_ENTRY.pack(
+            code, glyph["width"], glyph["height"], glyph["dx"], glyph["dy"],
+            glyph["shift_x"], data_start + len(bitmaps),
+        )
+        for row in glyph["rows"]:
+            bitmaps += row[:row_bytes].ljust(row_bytes, b"\0")
+    header = HEADER.pack(MAGIC, len(wanted), *bbox, ascent, descent)
+    return header + bytes(index) + bytes(bitmaps), len(glyphs), len(wanted)
+
+
+def main():
+    for name, charset in SUBSETS.items():
+        bdf_path = os.path.join(FONT_DIR, name)
+        data, total, kept = build_btf(bdf_path, charset)
+        out_path = bdf_path[:-4] + ".btf"
+        with open(out_path, "wb") as f:
+            f.write(data)
+        print(
+            f"{name}: {kept}/{total} glyphs, {os.path.getsize(bdf_path)} -> {len(data)} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Precompile the Source/blocktron modules to .mpy with mpy-cross.
+
+The .mpy files are written next to their sources and picked up by
+make_manifest.py, so OTA ships compiled modules. Use the mpy-cross build that
+matches the device's CircuitPython major version (9.x):
+
+    python Tools/build_mpy.py --mpy-cross /path/to/mpy-cross
+    python Tools/make_manifest.py
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SOURCE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Source"))
+PACKAGE_DIRS = ["blocktron"]
+
+
+def compile_module(mpy_cross, source_dir, relative_path):
+    out_path = relative_path[:-3] + ".mpy"
+    subprocess.run(
+        [mpy_cross, "-o", out_path, relative_path],
+        cwd=source_dir,
+        check=True,
+    )
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mpy-cross", default="mpy-cross", help="path to the mpy-cross binary")
+    parser.add_argument("--source", default=SOURCE_DIR, help="device filesystem root")
+    args = parser.parse_args()
+
+    built = 0
+    for package in PACKAGE_DIRS:
+        root = os.path.join(args.source, package)
+        for entry in sorted(os.listdir(root)):
+            if not entry.endswith(".py"):
+                continue
+            try:
+                out_path = compile_module(args.mpy_cross, args.source, f"{package}/{entry}")
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"mpy-cross failed for {package}/{entry}: {e}", file=sys.stderr)
+                return 1
+            print(f"Built {out_path}")
+            built += 1
+    print(f"Compiled {built} modules")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
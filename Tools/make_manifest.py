@@ -0,0 +1,115 @@
+"""Generate Source/ota_manifest.json, the size + SHA-256 list devices diff and verify OTA files against.
+
+"files" are the OTA targets. "libraries" lists the bundle libraries in
+Source/lib that 2.4.0 added (asyncio, adafruit_ticks); blocktron.upgrade
+fetches one only when a device updating from 2.3.x can't import it, so an
+installed .mpy build is never shadowed by these sources.
+
+Run from the repo root after changing any OTA target:
+
+    python Tools/make_manifest.py
+    python Tools/make_manifest.py --check   # exit 1 if the committed manifest is stale
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+SOURCE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Source"))
+MANIFEST_NAME = "ota_manifest.json"
+DEFAULT_FILES = ["code.py", "boot.py", "version_history.txt"]
+DEFAULT_DIRS = ["fonts"]  # every file in these is listed too
+MODULE_DIRS = ["blocktron"]  # modules are listed as .mpy when build_mpy.py has built them
+LIBRARY_DIR = "lib"  # listed under "libraries", not "files"
+
+
+def default_names(source_dir):
+    names = list(DEFAULT_FILES)
+    for directory in DEFAULT_DIRS:
+        root = os.path.join(source_dir, directory)
+        if not os.path.isdir(root):
+            continue
+        for entry in sorted(os.listdir(root)):
+            if os.path.isfile(os.path.join(root, entry)):
+                names.append(f"{directory}/{entry}")
+    for directory in MODULE_DIRS:
+        root = os.path.join(source_dir, directory)
+        if not os.path.isdir(root):
+            continue
+        for entry in sorted(os.listdir(root)):
+            if not entry.endswith(".py"):
+                continue
+            compiled = entry[:-3] + ".mpy"
+            if os.path.isfile(os.path.join(root, compiled)):
+                entry = compiled
+            names.append(f"{directory}/{entry}")
+    return names
+
+
+def library_names(source_dir):
+    names = []
+    root = os.path.join(source_dir, LIBRARY_DIR)
+    for directory, subdirs, entries in sorted(os.walk(root)):
+        subdirs[:] = [d for d in subdirs if d != "__pycache__"]
+        for entry in sorted(entries):
+            if entry.endswith((".py", ".mpy")):
+                names.append(os.path.relpath(os.path.join(directory, entry), source_dir).replace(os.sep, "/"))
+    return names
+
+
+def describe(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def build_manifest(source_dir, names):
+    return {
+        "files": {name: describe(os.path.join(source_dir, name)) for name in names},
+        "libraries": {name: describe(os.path.join(source_dir, name)) for name in library_names(source_dir)},
+    }
+
+
+def check(path, manifest):
+    """Compare the manifest at path with a fresh one; returns the exit status."""
+    with open(path, "r") as f:
+        committed = json.load(f)
+    stale = []
+    for section in ("files", "libraries"):
+        listed, current = committed.get(section, {}), manifest[section]
+        stale += sorted(name for name in set(listed) | set(current) if listed.get(name) != current.get(name))
+    if stale:
+        print(f"{path} is stale for: {', '.join(stale)}; run python Tools/make_manifest.py")
+        return 1
+    print(f"{path} is up to date ({len(committed['files'])} files, {len(committed.get('libraries', {}))} library files)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="paths relative to Source/ (default: code, boot, fonts, modules)")
+    parser.add_argument("--source", default=SOURCE_DIR, help="device filesystem root")
+    parser.add_argument("--check", action="store_true", help="only report whether the manifest is up to date")
+    args = parser.parse_args()
+
+    names = args.files or default_names(args.source)
+    manifest = build_manifest(args.source, names)
+    out_path = os.path.join(args.source, MANIFEST_NAME)
+    if args.check:
+        return check(out_path, manifest)
+    with open(out_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    modules = [name for name in names if name.split("/", 1)[0] in MODULE_DIRS]
+    compiled = sum(name.endswith(".mpy") for name in modules)
+    print(
+        f"Wrote {out_path} ({len(manifest['files'])} files, {len(manifest['libraries'])} library files;"
+        f" modules: {compiled} compiled, {len(modules) - compiled} source)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
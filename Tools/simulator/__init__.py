@@ -0,0 +1,5 @@
+"""Host-side simulator for running the BlockTron firmware under CPython.
+
+See run.py for usage. The stand-ins for the CircuitPython modules live in
+stubs/; the state they share for one simulated device lives in state.py.
+"""
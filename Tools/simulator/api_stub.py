@@ -0,0 +1,204 @@
+"""Local HTTP stand-in for the BlockTron API and the OTA file host.
+
+Every request from the simulated device arrives as /<original host>/<path>.
+The stub answers:
+
+    POST .../live_data_new          metrics as JSON, or CSV when the client accepts it
+    POST .../live_data_ticker_new   the ticker text, with an ETag
+    GET  .../get_settings/<id>      the cloud settings, with an ETag; keeps the
+                                    telemetry line the device pushes along
+    GET  anything else              files from the release directory (OTA), with
+                                    ETag and Range support
+
+Prices follow a random walk and the block height advances every
+block_interval seconds, so polls see realistic change rates.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_SETTINGS = {
+    "conf_device_timezone_utc_offset": 0,
+    "conf_api_btc_price_refresh_interval": 10,
+    "conf_api_ticker_refresh_interval": 30,
+    "api_settings_refresh_interval": 60,
+    "conf_device_boot_text_top": "",
+    "conf_device_boot_text_bottom": "BlockTron",
+}
+DEFAULT_TICKER = "SIMULATOR  BTC  MEMPOOL 12 sat/vB  HALVING IN 1234 BLOCKS"
+
+
+class MarketModel:
+    def __init__(self, price=97000, block_height=880000, block_interval=600, seed=None):
+        self._random = random.Random(seed)
+        self.price = price
+        self.block_height = block_height
+        self.block_interval = block_interval
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self._random.random() < 0.7:
+                self.price = max(1, self.price + self._random.randint(-40, 40))
+            height = self.block_height + int((time.monotonic() - self._started) / self.block_interval)
+            return self.price, height, 100_000_000 // self.price
+
+
+class ApiStub:
+    def __init__(
+        self, release_dir, settings=None, ticker=DEFAULT_TICKER, csv=False, latency=0.0, market=None,
+        address=("127.0.0.1", 0),
+    ):
+        self.release_dir = release_dir
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.ticker = ticker
+        self.csv = csv  # Answer text/csv when the client's Accept header allows it
+        self.latency = latency  # Seconds added to every response
+        self.outage = False  # Answer 503 to every API call while set
+        self.market = market or MarketModel()
+        self.requests = {}  # route -> count
+        self.bytes_sent = 0
+        self.telemetry = None  # Last X-BlockTron-Telemetry header pushed with a settings poll
+        self.address = address  # (host, port) to listen on; port 0 picks a free one
+        self._server = None
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        stub = self
+
+        class Handler(_Handler):
+            api = stub
+
+        self._server = ThreadingHTTPServer(self.address, Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def count(self, route):
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api = None  # ApiStub, set by ApiStub.start()
+    protocol_version = "HTTP/1.1"
+    # Buffer each response and send it when the handler returns. Unbuffered,
+    # the headers and body leave as two writes on a keep-alive socket, and
+    # Nagle plus delayed ACK held every response with a body for ~40ms.
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _host_path(self):
+        _, host, path = self.path.split("/", 2) if self.path.count("/") >= 2 else ("", "", "")
+        return host, "/" + path
+
+    def _send(self, status, body=b"", content_type="application/json", headers=None):
+        if self.api.latency:
+            time.sleep(self.api.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+        self.api.bytes_sent += len(body)
+
+    def _send_tagged(self, body, content_type):
+        """Send body with an ETag, or 304 if the client already has it."""
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers={"ETag": etag})
+        else:
+            self._send(200, body, content_type, {"ETag": etag})
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_POST(self):
+        self._read_body()
+        _, path = self._host_path()
+        if path.endswith("/live_data_new"):
+            self.api.count("live_data")
+            if self.api.outage:
+                return self._send(503, b'{"error": "outage"}')
+            price, height, moscow = self.api.market.sample()
+            if self.api.csv and "text/csv" in (self.headers.get("Accept") or ""):
+                return self._send(200, f"{price},{height},{moscow}\n".encode(), "text/csv")
+            metrics = [
+                {"metric_name": "btc_price", "metric_value": str(price)},
+                {"metric_name": "block_height", "metric_value": str(height)},
+                {"metric_name": "moscow_time", "metric_value": str(moscow)},
+                {"metric_name": "fee_rate", "metric_value": "12"},
+            ]
+            # Extra fields after the value, nested ones included, as the parser has to skip them
+            for row_id, row in enumerate(metrics, 1):
+                row["id"] = row_id
+                row["meta"] = {"source": "stub", "tags": ["live", {"unit": None}]}
+            return self._send(200, json.dumps(metrics).encode())
+        if path.endswith("/live_data_ticker_new"):
+            self.api.count("ticker")
+            if self.api.outage:
+                return self._send(503, b'{"error": "outage"}')
+            if self.headers.get("If-None-Match") or self.headers.get("If-Modified-Since"):
+                return self._send(412, b'{"error": "precondition failed"}')  # As a real server does on a POST
+            return self._send(200, json.dumps(self.api.ticker).encode())
+        self.api.count("unknown")
+        self._send(404, b'{"error": "not found"}')
+
+    def do_GET(self):
+        _, path = self._host_path()
+        if "/get_settings/" in path:
+            self.api.count("settings")
+            self.api.telemetry = self.headers.get("X-BlockTron-Telemetry") or self.api.telemetry
+            if self.api.outage:
+                return self._send(503, b'{"error": "outage"}')
+            return self._send_tagged(json.dumps(self.api.settings).encode(), "application/json")
+        self._send_file(path)
+
+    do_HEAD = do_GET
+
+    def _send_file(self, path):
+        """Serve the longest suffix of path that names a file in the release directory."""
+        parts = [p for p in path.split("/") if p]
+        for start in range(len(parts)):
+            candidate = os.path.join(self.api.release_dir, *parts[start:])
+            if os.path.isfile(candidate):
+                break
+        else:
+            self.api.count("ota_missing")
+            return self._send(404, b"not found", "text/plain")
+        self.api.count("ota")
+        with open(candidate, "rb") as f:
+            data = f.read()
+        etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers={"ETag": etag})
+        range_header = self.headers.get("Range") or ""
+        if range_header.startswith("bytes=") and range_header.endswith("-"):
+            offset = int(range_header[6:-1])
+            if offset < len(data):
+                return self._send(
+                    206, data[offset:], "application/octet-stream",
+                    {"ETag": etag, "Content-Range": f"bytes {offset}-{len(data) - 1}/{len(data)}"},
+                )
+        self._send(200, data, "application/octet-stream", {"ETag": etag})
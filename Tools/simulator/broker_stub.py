@@ -0,0 +1,93 @@
+"""In-process stand-in for the BlockTron MQTT broker.
+
+The simulated adafruit_minimqtt client talks to this object directly rather
+than over a socket. The broker checks the device's credentials, retains the
+latest message on every topic and publishes what the API stub serves: a
+market sample every interval seconds when it changed, the ticker text and
+each account's settings. drop() cuts every client off, to exercise the
+firmware's fallback to polling; update_settings() changes the cloud settings
+and pushes them, e.g. to turn the live feed off.
+"""
+
+import json
+import threading
+import time
+
+
+class BrokerStub:
+    def __init__(self, api, accounts, interval=5.0):
+        self.api = api  # ApiStub whose market, ticker and settings are published
+        self.accounts = dict(accounts)  # username -> password
+        self.interval = interval
+        self.retained = {}  # topic -> last message
+        self.subscriptions = {}  # client -> set of topics
+        self.refuse_until = 0.0
+        self.connects = 0
+        self.published = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.publish("blocktron/ticker", self.api.ticker)
+        for username in self.accounts:
+            self.publish(f"blocktron/devices/{username}/settings", json.dumps(self.api.settings))
+        self._thread = threading.Thread(target=self._publish_market, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _publish_market(self):
+        last = None
+        while not self._stopped.is_set():
+            sample = self.api.market.sample()
+            if sample != last:
+                self.publish("blocktron/market", ",".join(str(v) for v in sample))
+                last = sample
+            self._stopped.wait(self.interval)
+
+    def publish(self, topic, message):
+        with self._lock:
+            self.retained[topic] = message
+            self.published += 1
+            for client, topics in self.subscriptions.items():
+                if topic in topics:
+                    client._deliver(topic, message)
+
+    def connect(self, client, username, password):
+        """Returns an error message, or None once client is connected."""
+        if time.monotonic() < self.refuse_until:
+            return "Connection Refused - Server unavailable"
+        if self.accounts.get(username) != password:
+            return "Connection Refused - Incorrect username/password"
+        with self._lock:
+            self.subscriptions[client] = set()
+            self.connects += 1
+        return None
+
+    def subscribe(self, client, topic):
+        with self._lock:
+            self.subscriptions[client].add(topic)
+            if topic in self.retained:
+                client._deliver(topic, self.retained[topic])
+
+    def disconnect(self, client):
+        with self._lock:
+            self.subscriptions.pop(client, None)
+
+    def update_settings(self, **changes):
+        """Change the API stub's settings and push them to every account."""
+        self.api.settings.update(changes)
+        for username in self.accounts:
+            self.publish(f"blocktron/devices/{username}/settings", json.dumps(self.api.settings))
+
+    def drop(self, refuse_for=0.0):
+        """Disconnect every client and refuse new connections for refuse_for seconds."""
+        with self._lock:
+            for client in self.subscriptions:
+                client._drop()
+            self.subscriptions.clear()
+            self.refuse_until = time.monotonic() + refuse_for
+        print(f"[sim] broker dropped all clients, refusing connections for {refuse_for:.0f}s")
@@ -0,0 +1,199 @@
+"""Run firmware files against the simulated CIRCUITPY drive.
+
+Firmware modules are compiled with their own builtins: open() and the os
+module resolve device paths such as "/fonts/x.bdf" or "code.py" inside the
+simulated drive and honour its read-only state, and gc gains CircuitPython's
+mem_free() / mem_alloc(). The host's own modules are left untouched.
+"""
+
+import builtins
+import collections
+import gc as host_gc
+import importlib.abc
+import importlib.util
+import os as host_os
+import sys
+import tracemalloc
+import types
+
+from simulator import state
+
+STUBS_DIR = host_os.path.join(host_os.path.dirname(host_os.path.abspath(__file__)), "stubs")
+DEVICE_SEARCH_DIRS = ("", "lib")  # CircuitPython's sys.path, relative to the drive root
+EXCLUDED_MODULES = ("code", "boot")  # Run by the runner, never imported
+UnameResult = collections.namedtuple("UnameResult", "sysname nodename release version machine")
+
+
+def _device_open(path, mode="r", *args, **kwargs):
+    if any(flag in mode for flag in "wax+"):
+        state.check_writable(path)
+    return builtins.open(state.device_path(path), mode, *args, **kwargs)
+
+
+def _make_os():
+    module = types.ModuleType("os")
+    module.sep = "/"
+
+    def stat(path):
+        return host_os.stat(state.device_path(path))
+
+    def listdir(path="/"):
+        return sorted(host_os.listdir(state.device_path(path)))
+
+    def mkdir(path):
+        state.check_writable(path)
+        host_os.mkdir(state.device_path(path))
+
+    def rmdir(path):
+        state.check_writable(path)
+        host_os.rmdir(state.device_path(path))
+
+    def remove(path):
+        state.check_writable(path)
+        host_os.remove(state.device_path(path))
+
+    def rename(old, new):
+        state.check_writable(old)
+        host_os.replace(state.device_path(old), state.device_path(new))
+
+    def getcwd():
+        return "/"
+
+    def sync():
+        pass
+
+    def uname():
+        return UnameResult("ESP32S3", "sim", "9.2.0", "9.2.0 on simulator", "Adafruit MatrixPortal S3 with ESP32S3")
+
+    def urandom(n):
+        return host_os.urandom(n)
+
+    def getenv(key, default=None):
+        """Read key from settings.toml like CircuitPython does (strings and ints only)."""
+        try:
+            with builtins.open(state.device_path("settings.toml")) as f:
+                for line in f:
+                    name, sep, value = line.partition("=")
+                    if sep and name.strip() == key:
+                        value = value.split("#", 1)[0].strip()
+                        if value[:1] in "\"'":
+                            return value[1:-1]
+                        return int(value)
+        except (OSError, ValueError):
+            pass
+        return default
+
+    for func in (stat, listdir, mkdir, rmdir, remove, rename, getcwd, sync, uname, urandom, getenv):
+        setattr(module, func.__name__, func)
+    return module
+
+
+def _make_gc():
+    module = types.ModuleType("gc")
+    module.enable = host_gc.enable
+    module.disable = host_gc.disable
+    module.isenabled = host_gc.isenabled
+
+    def collect():
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        return host_gc.collect()
+
+    def mem_alloc():
+        """Traced bytes in use (0 without --heap).
+
+        MicroPython only reclaims memory in gc.collect(), so between collections
+        this reports the high-water mark rather than what CPython has freed.
+        """
+        if not tracemalloc.is_tracing():
+            return 0
+        return tracemalloc.get_traced_memory()[1]
+
+    def mem_free():
+        return max(state.heap_size - mem_alloc(), 0)
+
+    module.collect = collect
+    module.mem_alloc = mem_alloc
+    module.mem_free = mem_free
+    return module
+
+
+class DeviceImporter(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Finds modules on the simulated drive and runs them with device builtins."""
+
+    def __init__(self):
+        self.overrides = {"os": _make_os(), "gc": _make_gc()}
+        self.builtins = dict(builtins.__dict__)
+        self.builtins["open"] = _device_open
+        self.builtins["__import__"] = self._import
+        self.loaded = set()
+        self.namespace = None  # Globals of the script currently running as __main__
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in self.overrides:
+            return self.overrides[name]
+        return builtins.__import__(name, globals, locals, fromlist, level)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if state.root is None or fullname.split(".")[0] in EXCLUDED_MODULES:
+            return None
+        parts = fullname.split(".")
+        for search_dir in DEVICE_SEARCH_DIRS:
+            base = host_os.path.join(state.root, search_dir, *parts)
+            package_init = host_os.path.join(base, "__init__.py")
+            if host_os.path.isfile(package_init):
+                return importlib.util.spec_from_file_location(
+                    fullname, package_init, loader=self, submodule_search_locations=[base]
+                )
+            if host_os.path.isfile(base + ".py"):
+                return importlib.util.spec_from_file_location(fullname, base + ".py", loader=self)
+            if host_os.path.isfile(base + ".mpy"):
+                raise ImportError(f"{fullname}: the simulator runs sources, not .mpy files")
+        return None
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        self.loaded.add(module.__name__)
+        module.__dict__["__builtins__"] = self.builtins
+        origin = module.__spec__.origin
+        with builtins.open(origin, "r", encoding="utf-8") as f:
+            source = f.read()
+        exec(compile(source, origin, "exec"), module.__dict__)
+
+    def run_script(self, name):
+        """Run a top-level script such as boot.py or code.py as __main__."""
+        path = state.device_path(name)
+        if not host_os.path.isfile(path):
+            return False
+        with builtins.open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        namespace = {"__name__": "__main__", "__file__": "/" + name, "__builtins__": self.builtins}
+        self.namespace = namespace
+        exec(compile(source, path, "exec"), namespace)
+        return True
+
+    def purge(self):
+        """Forget every firmware and stub module so the next boot starts clean."""
+        stub_names = {
+            entry[:-3] if entry.endswith(".py") else entry
+            for entry in host_os.listdir(STUBS_DIR)
+            if not entry.startswith("_")
+        }
+        for name in list(sys.modules):
+            if name.split(".")[0] in stub_names or name in self.loaded:
+                del sys.modules[name]
+        self.loaded.clear()
+
+
+def install():
+    """Put the stubs on sys.path and the device importer in front of the host's."""
+    if STUBS_DIR not in sys.path:
+        sys.path.insert(0, STUBS_DIR)
+    for finder in sys.meta_path:
+        if isinstance(finder, DeviceImporter):
+            return finder
+    importer = DeviceImporter()
+    sys.meta_path.insert(0, importer)
+    return importer
@@ -0,0 +1,294 @@
+"""Run the BlockTron firmware on a Linux host against stand-in CircuitPython modules.
+
+boot.py and code.py run unchanged. The CIRCUITPY drive is a copy of Source/
+in a work directory, microcontroller.nvm is backed by a file there, and every
+HTTP(S) request goes to a local API stub (api_stub.py) that also serves a
+release copy of Source/ for OTA. microcontroller.reset() boots the device
+again, running boot.py first, so the OTA state machine can be followed across
+resets.
+
+    python Tools/simulator/run.py --duration 60
+    python Tools/simulator/run.py --duration 120 --frames 50
+    python Tools/simulator/run.py --publish version_history.txt --set ota.OTA_CHECK_INTERVAL=15
+
+Options worth knowing:
+    --set MODULE.NAME=VALUE  override a blocktron module constant before code.py runs
+    --publish FILE           change FILE in the release copy so an OTA update is offered
+    --state DIR              keep the drive and NVM in DIR between runs
+    --snapshot PATH          write the last frame as a PPM image
+    --heap                   trace allocations so gc.mem_alloc() reports real numbers
+    --live                   push updates over the MQTT broker stand-in (broker_stub.py)
+    --live-drop SECONDS      cut the broker connection after SECONDS, to see polling take over
+    --live-off SECONDS       push settings that turn the live feed off after SECONDS
+    --wifi-drop SECONDS      drop WiFi after SECONDS, to see the direct rejoin
+    --ap-moved               with --wifi-drop, bring the access point back on another BSSID and channel
+    --remove PATH            delete PATH from the drive first; --remove blocktron follows the
+                             first boot after an OTA update from 2.3.x
+"""
+
+import argparse
+import ast
+import importlib
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "Source")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+from simulator import state  # noqa: E402
+from simulator import device  # noqa: E402
+from simulator.api_stub import ApiStub  # noqa: E402
+from simulator.broker_stub import BrokerStub  # noqa: E402
+
+DEVICE_KEYS = {"deviceId": "SIM-0001", "apiKey": "sim-key"}
+LIVE_SETTINGS = {"conf_live_broker": "mqtt.sim", "conf_live_port": 1883}
+LIVE_OUTAGE = 30  # Seconds the broker refuses connections after --live-drop
+WIFI_SETTINGS = 'CIRCUITPY_WIFI_SSID = "blocktron-sim"\nCIRCUITPY_WIFI_PASSWORD = "sim-password"\n'
+
+
+def prepare_work_dir(work_dir, source_dir, fresh):
+    """Create <work>/device (the drive) and <work>/release (the OTA host) from source_dir."""
+    drive = os.path.join(work_dir, "device")
+    release = os.path.join(work_dir, "release")
+    ignore = shutil.ignore_patterns("__pycache__", "*.pyc")
+    # The host's asyncio and the stand-ins in stubs/ play the drive's bundle
+    # libraries, so Source/lib (the sources a 2.3.x upgrade can fetch) is only
+    # served from the release
+    drive_ignore = shutil.ignore_patterns("__pycache__", "*.pyc", "lib")
+    for target, target_ignore in ((drive, drive_ignore), (release, ignore)):
+        if fresh or not os.path.isdir(target):
+            shutil.rmtree(target, ignore_errors=True)
+            shutil.copytree(source_dir, target, ignore=target_ignore)
+    keys_path = os.path.join(drive, "device_keys.json")
+    if not os.path.exists(keys_path):
+        with open(keys_path, "w") as f:
+            json.dump(DEVICE_KEYS, f)
+    settings_path = os.path.join(drive, "settings.toml")
+    if not os.path.exists(settings_path):
+        with open(settings_path, "w") as f:
+            f.write(WIFI_SETTINGS)
+    if fresh:
+        nvm_path = os.path.join(work_dir, "nvm.bin")
+        if os.path.exists(nvm_path):
+            os.remove(nvm_path)
+    return drive, release
+
+
+def publish(release_dir, name):
+    """Change one file in the release and rebuild its manifest, as a real release would."""
+    import make_manifest
+
+    path = os.path.join(release_dir, name)
+    with open(path, "a") as f:
+        f.write(f"\nSimulated release {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    manifest = make_manifest.build_manifest(release_dir, make_manifest.default_names(release_dir))
+    with open(os.path.join(release_dir, make_manifest.MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"[sim] published a new {name}")
+
+
+def disable_live(sim):
+    """Push settings with no broker, as the cloud does when live updates are switched off."""
+    polls = sim.stub.requests.get("live_data", 0)
+    sim.broker.update_settings(conf_live_broker="")
+    print(f"[sim] live feed switched off by a settings push ({polls} market poll(s) so far)")
+
+
+def drop_wifi(move_ap=False):
+    """Take the radio off the network, optionally moving the access point."""
+    state.wifi_connected = False
+    if move_ap:
+        state.wifi_bssid = bytes.fromhex("02a0c9000002")
+        state.wifi_channel = 11
+    print(f"[sim] WiFi dropped{'; access point moved' if move_ap else ''}")
+
+
+def parse_overrides(items):
+    overrides = []
+    for item in items:
+        target, _, value = item.partition("=")
+        module, _, name = target.rpartition(".")
+        if not module or not name:
+            raise SystemExit(f"--set expects MODULE.NAME=VALUE, got {item!r}")
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass  # keep it as a string
+        overrides.append((f"blocktron.{module}", name, value))
+    return overrides
+
+
+def _nvm_head():
+    if not os.path.exists(state.nvm_path):
+        return b"\0\0\0"
+    with open(state.nvm_path, "rb") as f:
+        return f.read(3)
+
+
+class Simulation:
+    """One simulated device: its drive, NVM, API stub and boot loop.
+
+    run.py drives it from the command line; other tools (the benchmark
+    harness) use it directly and hook in through before_code and
+    state.refresh_hooks.
+    """
+
+    def __init__(
+        self, work_dir=None, source_dir=SOURCE_DIR, settings=None, csv=False, latency=0.0, heap=False, live=False
+    ):
+        state.new_simulation()
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix="blocktron-sim-")
+        self.drive, self.release = prepare_work_dir(self.work_dir, source_dir, fresh=not work_dir)
+        if live:
+            settings = dict(LIVE_SETTINGS, **(settings or {}))
+        self.stub = ApiStub(self.release, settings=settings, csv=csv, latency=latency).start()
+        self.broker = None
+        if live:
+            self.broker = BrokerStub(self.stub, {DEVICE_KEYS["deviceId"]: DEVICE_KEYS["apiKey"]}).start()
+            state.broker = self.broker
+        state.root = self.drive
+        state.nvm_path = os.path.join(self.work_dir, "nvm.bin")
+        state.api_port = self.stub.port
+        self.heap = heap
+        if heap and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.importer = device.install()
+        self.boot_started = None  # monotonic time the current boot started
+        self.code_started = None  # monotonic time the current boot started code.py
+        self.outcome = None
+
+    def publish(self, name):
+        publish(self.release, name)
+
+    def boot(self, overrides=(), before_code=None, script="code.py"):
+        """One power cycle: boot.py, then script. Returns how it ended."""
+        state.new_boot()
+        self.importer.purge()
+        self.boot_started = time.monotonic()
+        self.code_started = None
+        print(f"[sim] ---- boot {state.boots} (nvm[0..2]={list(_nvm_head())}) ----")
+        try:
+            state.in_boot_py = True
+            self.importer.run_script("boot.py")
+            state.in_boot_py = False
+            for module_name, name, value in overrides:
+                setattr(importlib.import_module(module_name), name, value)
+            if before_code is not None:
+                before_code(self)
+            self.code_started = time.monotonic()
+            self.importer.run_script(script)
+            return "exited"
+        except state.SimulatedReset:
+            return "reset"
+        finally:
+            state.in_boot_py = False
+
+    def run(self, duration, max_boots=10, overrides=(), before_code=None, script="code.py"):
+        """Boot until the device stops resetting, max_boots is reached or duration expires."""
+
+        def timeout(signum, frame):
+            raise state.SimulationTimeout()
+
+        previous = signal.signal(signal.SIGALRM, timeout)
+        signal.setitimer(signal.ITIMER_REAL, duration)
+        try:
+            while state.boots < max_boots:
+                self.outcome = self.boot(overrides, before_code, script)
+                print(f"[sim] boot {state.boots} ended: {self.outcome}")
+                if self.outcome != "reset":
+                    break
+        except state.SimulationTimeout:
+            self.outcome = "timeout"
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        return self.outcome
+
+    def close(self):
+        self.stub.stop()
+        if self.broker is not None:
+            self.broker.stop()
+        self.importer.purge()
+        if self.heap:
+            tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=SOURCE_DIR, help="firmware tree to copy onto the drive")
+    parser.add_argument("--state", help="work directory kept between runs (default: a temp dir)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of simulated runtime")
+    parser.add_argument("--max-boots", type=int, default=10, help="stop after this many boots")
+    parser.add_argument("--set", action="append", default=[], metavar="MODULE.NAME=VALUE")
+    parser.add_argument("--publish", action="append", default=[], metavar="FILE")
+    parser.add_argument("--remove", action="append", default=[], metavar="PATH", help="delete PATH from the drive first")
+    parser.add_argument("--settings", default="{}", help="JSON merged into the stub's cloud settings")
+    parser.add_argument("--csv", action="store_true", help="let the stub answer metrics as CSV")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every stub response")
+    parser.add_argument("--frames", type=int, default=0, metavar="N", help="print every Nth frame as text")
+    parser.add_argument("--snapshot", help="write the last frame as a PPM image")
+    parser.add_argument("--heap", action="store_true", help="trace allocations for gc.mem_alloc()")
+    parser.add_argument("--live", action="store_true", help="push updates over the MQTT broker stand-in")
+    parser.add_argument("--live-drop", type=float, metavar="SECONDS", help="cut the broker connection after SECONDS")
+    parser.add_argument("--live-off", type=float, metavar="SECONDS", help="push settings turning the live feed off after SECONDS")
+    parser.add_argument("--wifi-drop", type=float, metavar="SECONDS", help="drop WiFi after SECONDS")
+    parser.add_argument("--ap-moved", action="store_true", help="with --wifi-drop, move the access point to another BSSID")
+    args = parser.parse_args(argv)
+
+    sim = Simulation(
+        args.state, args.source, json.loads(args.settings), args.csv, args.latency, args.heap, args.live or bool(args.live_drop or args.live_off)
+    )
+    if args.live_drop:
+        threading.Timer(args.live_drop, sim.broker.drop, (LIVE_OUTAGE,)).start()
+    if args.live_off:
+        threading.Timer(args.live_off, disable_live, (sim,)).start()
+    if args.wifi_drop:
+        threading.Timer(args.wifi_drop, drop_wifi, (args.ap_moved,)).start()
+    for name in args.publish:
+        sim.publish(name)
+    for name in args.remove:
+        path = os.path.join(sim.drive, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        print(f"[sim] removed {name} from the drive")
+    if args.frames:
+        def print_frame(display):
+            if display.frames % args.frames == 0:
+                print(f"[sim] frame {display.frames}\n{display.ascii()}")
+        state.refresh_hooks.append(print_frame)
+
+    started = time.monotonic()
+    try:
+        outcome = sim.run(args.duration, args.max_boots, parse_overrides(args.set))
+    finally:
+        sim.close()
+
+    display = state.display
+    print(f"[sim] {outcome} after {time.monotonic() - started:.1f}s, {state.boots} boot(s), work dir {sim.work_dir}")
+    print(f"[sim] stub requests: {sim.stub.requests}")
+    print(f"[sim] wifi: {state.wifi_joins} join(s), {state.wifi_scans} scan(s); {state.dns_lookups} DNS lookup(s)")
+    if sim.broker is not None:
+        print(f"[sim] broker: {sim.broker.connects} connect(s), {sim.broker.published} message(s) published")
+    if sim.stub.telemetry:
+        print(f"[sim] last telemetry push: {sim.stub.telemetry}")
+    if display is not None:
+        print(f"[sim] {display.frames} refreshes; last frame:\n{display.ascii()}")
+        if args.snapshot:
+            display.write_ppm(args.snapshot)
+            print(f"[sim] wrote {args.snapshot}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""State shared by the stand-in modules for one simulated device.
+
+The runner fills this in before each boot; the stubs read it instead of
+talking to hardware. Everything that must survive a simulated reset (the
+filesystem and NVM) lives on the host disk, everything else is reset by
+new_boot().
+"""
+
+import errno
+import os
+
+
+class SimulatedReset(BaseException):
+    """Raised by microcontroller.reset(); the runner boots the device again.
+
+    Derived from BaseException so the firmware's `except Exception` handlers
+    don't swallow it, just as nothing survives a real reset.
+    """
+
+
+class SimulationTimeout(BaseException):
+    """Raised when the runner's --duration expires."""
+
+
+root = None  # Host directory standing in for the CIRCUITPY drive
+nvm_path = None  # Host file backing microcontroller.nvm across resets
+nvm_size = 8192  # ESP32-S3 CircuitPython NVM size
+api_host = "127.0.0.1"
+api_port = None  # Port of the local API stub; every HTTP(S) host is routed there
+broker = None  # BrokerStub the adafruit_minimqtt stand-in connects to, if live updates are simulated
+heap_size = 2 * 1024 * 1024  # Reported as gc.mem_free() + gc.mem_alloc()
+
+gateway_reachable = True  # What wifi.radio.ping() answers
+wifi_connected = True
+wifi_ssid = "blocktron-sim"
+wifi_bssid = bytes.fromhex("02a0c9000001")  # The one access point in range
+wifi_channel = 6
+wifi_rssi = -58
+wifi_join_seconds = 0.3  # Associating with a known BSSID and channel
+wifi_scan_seconds = 2.5  # Extra time a join without them spends scanning every channel
+wifi_joins = 0
+wifi_scans = 0
+dns_lookups = 0  # Names resolved through socketpool, including inside connect()
+
+# Per boot
+in_boot_py = False
+usb_drive_enabled = True
+readonly = True
+display = None  # framebufferio.FramebufferDisplay of the current boot
+boots = 0
+
+# Callbacks run after every display refresh with the display as argument
+refresh_hooks = []
+
+
+def new_simulation():
+    """Forget everything from a previous simulation in this process."""
+    global in_boot_py, usb_drive_enabled, readonly, display, boots, refresh_hooks, gateway_reachable, wifi_connected
+    global broker, wifi_joins, wifi_scans, dns_lookups
+    in_boot_py = False
+    usb_drive_enabled = True
+    readonly = True
+    display = None
+    boots = 0
+    refresh_hooks = []
+    gateway_reachable = True
+    wifi_connected = True
+    broker = None
+    wifi_joins = 0
+    wifi_scans = 0
+    dns_lookups = 0
+
+
+def new_boot():
+    global in_boot_py, usb_drive_enabled, readonly, display, boots
+    in_boot_py = False
+    usb_drive_enabled = True
+    readonly = True
+    display = None
+    boots += 1
+
+
+def device_path(path):
+    """Map a device path ("/fonts/x.bdf" or "code.py") into the host root."""
+    return os.path.join(root, str(path).lstrip("/"))
+
+
+def check_writable(path):
+    if readonly:
+        raise OSError(errno.EROFS, "Read-only filesystem", str(path))
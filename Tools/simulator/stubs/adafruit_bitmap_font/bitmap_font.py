@@ -0,0 +1,80 @@
+"""Stand-in for adafruit_bitmap_font: parses a BDF file from the simulated drive."""
+
+import displayio
+from fontio import Glyph
+
+from simulator import state
+
+
+class BDF:
+    def __init__(self, path):
+        self._glyphs = {}
+        self._raw = {}
+        self._bounding_box = (0, 0, 0, 0)
+        self.ascent = 0
+        self.descent = 0
+        self._parse(state.device_path(path))
+
+    def _parse(self, path):
+        glyph = None
+        rows = None
+        with open(path, "r", encoding="latin-1") as f:
+            for line in f:
+                fields = line.split()
+                if not fields:
+                    continue
+                key = fields[0]
+                if rows is not None:
+                    if key == "ENDCHAR":
+                        glyph["rows"] = rows
+                        if glyph["code"] >= 0:
+                            self._raw[glyph["code"]] = glyph
+                        glyph = rows = None
+                    else:
+                        rows.append(int(key, 16) if key else 0)
+                        glyph["row_bits"] = len(key) * 4
+                elif key == "FONTBOUNDINGBOX":
+                    self._bounding_box = tuple(int(v) for v in fields[1:5])
+                elif key == "FONT_ASCENT":
+                    self.ascent = int(fields[1])
+                elif key == "FONT_DESCENT":
+                    self.descent = int(fields[1])
+                elif key == "STARTCHAR":
+                    glyph = {"code": -1, "shift_x": 0, "bbx": (0, 0, 0, 0), "row_bits": 8}
+                elif key == "ENCODING":
+                    glyph["code"] = int(fields[1])
+                elif key == "DWIDTH":
+                    glyph["shift_x"] = int(fields[1])
+                elif key == "BBX":
+                    glyph["bbx"] = tuple(int(v) for v in fields[1:5])
+                elif key == "BITMAP":
+                    rows = []
+
+    def get_bounding_box(self):
+        return self._bounding_box
+
+    def load_glyphs(self, code_points):
+        if isinstance(code_points, (int, str)):
+            code_points = (code_points,) if isinstance(code_points, int) else code_points
+        for code_point in code_points:
+            self.get_glyph(ord(code_point) if isinstance(code_point, str) else code_point)
+
+    def get_glyph(self, code_point):
+        if code_point in self._glyphs:
+            return self._glyphs[code_point]
+        raw = self._raw.get(code_point)
+        glyph = None
+        if raw is not None:
+            width, height, dx, dy = raw["bbx"]
+            bitmap = displayio.Bitmap(max(width, 1), max(height, 1), 2)
+            for y, row in enumerate(raw["rows"][:height]):
+                for x in range(width):
+                    if row & (1 << (raw["row_bits"] - 1 - x)):
+                        bitmap[x, y] = 1
+            glyph = Glyph(bitmap, 0, width, height, dx, dy, raw["shift_x"], 0)
+        self._glyphs[code_point] = glyph
+        return glyph
+
+
+def load_font(filename, bitmap=None):
+    return BDF(filename)
@@ -0,0 +1,101 @@
+"""Stand-in for adafruit_connection_manager: keep-alive sockets to the local API stub.
+
+A "socket" is an http.client connection to the stub; whatever host the
+firmware asks for is sent along in the request path so the stub can route it.
+Sockets are opened the way the real library does it: getaddrinfo() first,
+then TLS sockets connect by host name (resolving it again) and plain ones by
+the address.
+"""
+
+import http.client
+
+import socketpool
+
+from simulator import state
+
+
+class SimSocket:
+    def __init__(self, host, port, is_ssl, timeout):
+        self.host = host
+        self.port = port
+        self.is_ssl = is_ssl
+        self.connection = http.client.HTTPConnection(state.api_host, state.api_port, timeout=timeout)
+        self.closed = False
+
+    def connect(self, address):
+        host = address[0]
+        if not host.replace(".", "").isdigit():
+            state.dns_lookups += 1  # CircuitPython resolves names passed to connect()
+
+    def settimeout(self, timeout):
+        self.connection.timeout = timeout
+        if self.connection.sock is not None:
+            self.connection.sock.settimeout(timeout)
+
+    def close(self):
+        self.closed = True
+        self.connection.close()
+
+
+class ConnectionManager:
+    def __init__(self, socket_pool):
+        self._socket_pool = socket_pool
+        self._sockets = {}  # (host, port, proto, session_id) -> SimSocket
+        self.opened = 0
+
+    def get_socket(self, host, port, proto, session_id=None, *, timeout=1, is_ssl=False, ssl_context=None):
+        key = (host, port, proto, session_id)
+        sock = self._sockets.get(key)
+        if sock is None or sock.closed:
+            addr_info = self._socket_pool.getaddrinfo(host, port, 0, socketpool.SOCK_STREAM)[0]
+            sock = SimSocket(host, port, is_ssl, timeout)
+            if is_ssl:
+                sock = ssl_context.wrap_socket(sock, server_hostname=host)
+                connect_host = host
+            else:
+                connect_host = addr_info[-1][0]
+            sock.connect((connect_host, port))
+            self._sockets[key] = sock
+            self.opened += 1
+        return sock
+
+    def free_socket(self, sock):
+        pass
+
+    def close_socket(self, sock):
+        for key, value in list(self._sockets.items()):
+            if value is sock:
+                del self._sockets[key]
+                sock.close()
+                return
+        raise RuntimeError("Socket not managed")
+
+    def close_all_for_pool(self, socket_pool):
+        for sock in self._sockets.values():
+            sock.close()
+        self._sockets.clear()
+
+
+_managers = {}
+_pools = {}
+
+
+class _SSLContext:
+    def wrap_socket(self, sock, server_side=False, server_hostname=None):
+        return sock
+
+
+def get_radio_socketpool(radio):
+    if radio not in _pools:
+        _pools[radio] = socketpool.SocketPool(radio)
+    return _pools[radio]
+
+
+def get_radio_ssl_context(radio):
+    return _SSLContext()
+
+
+def get_connection_manager(socket_pool):
+    if socket_pool not in _managers:
+        _managers[socket_pool] = ConnectionManager(socket_pool)
+    return _managers[socket_pool]
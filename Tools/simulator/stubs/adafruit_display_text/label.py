@@ -0,0 +1,78 @@
+"""Stand-in for adafruit_display_text.label: renders the text into one TileGrid."""
+
+import displayio
+import bitmaptools
+
+
+class Label(displayio.Group):
+    """Text in one TileGrid; (x, y) is the top-left corner of the font's bounding box."""
+
+    def __init__(self, font, *, text="", color=0xFFFFFF, background_color=None, scale=1, x=0, y=0, line_spacing=1.25, anchor_point=None, anchored_position=None, **kwargs):
+        super().__init__(scale=scale, x=x, y=y)
+        self.font = font
+        self._palette = displayio.Palette(2)
+        self._palette.make_transparent(0)
+        self._color = None
+        self.color = color
+        self._text = None
+        self._tile_grid = None
+        self.text = text
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, new_color):
+        self._color = new_color
+        if new_color is None:
+            self._palette.make_transparent(1)
+        else:
+            self._palette[1] = new_color
+            self._palette.make_opaque(1)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, new_text):
+        new_text = str(new_text)
+        if new_text == self._text:
+            return
+        self._text = new_text
+        self._render()
+
+    @property
+    def bounding_box(self):
+        if self._tile_grid is None:
+            return (0, 0, 0, 0)
+        return (self._tile_grid.x, self._tile_grid.y, self._tile_grid.bitmap.width, self._tile_grid.bitmap.height)
+
+    def _render(self):
+        if self._tile_grid is not None:
+            self.remove(self._tile_grid)
+            self._tile_grid = None
+        glyphs = [self.font.get_glyph(ord(ch)) for ch in self._text]
+        width = sum(g.shift_x for g in glyphs if g is not None)
+        if not width:
+            return
+        top = min((-(g.height + g.dy) for g in glyphs if g is not None), default=0)
+        bottom = max((-g.dy for g in glyphs if g is not None), default=0)
+        bitmap = displayio.Bitmap(width, max(bottom - top, 1), 2)
+        cursor = 0
+        for glyph in glyphs:
+            if glyph is None:
+                continue
+            if glyph.width and glyph.height:
+                bitmaptools.blit(
+                    bitmap, glyph.bitmap, max(cursor + glyph.dx, 0), -(glyph.height + glyph.dy) - top,
+                    x1=glyph.tile_index * glyph.width, y1=0,
+                    x2=(glyph.tile_index + 1) * glyph.width, y2=glyph.height,
+                    skip_source_index=0,
+                )
+            cursor += glyph.shift_x
+        _, font_height, _, font_y = self.font.get_bounding_box()
+        baseline = font_height + font_y
+        self._tile_grid = displayio.TileGrid(bitmap, pixel_shader=self._palette, x=0, y=baseline + top)
+        self.append(self._tile_grid)
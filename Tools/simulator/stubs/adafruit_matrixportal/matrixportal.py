@@ -0,0 +1,101 @@
+"""Stand-in for adafruit_matrixportal.matrixportal.MatrixPortal.
+
+Keeps the portalbase attributes the firmware reaches into (_text entries
+with "label" / "color", the _fonts cache, splash, graphics.display) and draws
+into the simulator's framebuffer instead of the RGB matrix.
+"""
+
+import displayio
+import framebufferio
+import wifi
+from adafruit_bitmap_font import bitmap_font
+from adafruit_display_text.label import Label
+
+from simulator import state
+
+
+class _Graphics:
+    def __init__(self, width, height):
+        self.display = framebufferio.FramebufferDisplay(width=width, height=height)
+        self.splash = displayio.Group()
+        self.display.root_group = self.splash
+        state.display = self.display
+
+
+class _Network:
+    def __init__(self, status_neopixel=None):
+        self.connects = 0
+
+    def connect(self, max_attempts=10):
+        self.connects += 1
+        wifi.radio.connect()
+
+    @property
+    def enabled(self):
+        return wifi.radio.enabled
+
+    @property
+    def is_connected(self):
+        return wifi.radio.connected
+
+
+class MatrixPortal:
+    def __init__(self, *, url=None, headers=None, json_path=None, regexp_path=None, json_transform=None, status_neopixel=None, esp=None, external_spi=None, bit_depth=2, alt_addr_pins=None, color_order="RGB", width=64, height=32, serpentine=True, tile_rows=1, rotation=0, debug=False, rgb_pins=None, addr_pins=None, clock_pin=None, latch_pin=None, output_enable_pin=None):
+        self.graphics = _Graphics(width, height)
+        self.display = self.graphics.display
+        self.splash = self.graphics.splash
+        self.network = _Network(status_neopixel)
+        self._text = []
+        self._fonts = {}
+        self._debug = debug
+
+    def _load_font(self, font):
+        if font not in self._fonts:
+            self._fonts[font] = bitmap_font.load_font(font)
+        return self._fonts[font]
+
+    def add_text(self, text_position=(0, 0), text_font=None, text_color=0x808080, text_wrap=False, text_maxlen=0, text_transform=None, text_scale=1, scrolling=False, line_spacing=1.25, text_anchor_point=None, is_data=True, text=None):
+        if text_font is None:
+            raise ValueError("the simulator needs an explicit text_font")
+        self._text.append(
+            {
+                "label": None,
+                "font": text_font,
+                "color": text_color,
+                "position": text_position,
+                "wrap": text_wrap,
+                "maxlen": text_maxlen,
+                "transform": text_transform,
+                "scale": text_scale,
+                "scrolling": scrolling,
+                "line_spacing": line_spacing,
+                "anchor_point": text_anchor_point,
+                "is_data": is_data,
+            }
+        )
+        index = len(self._text) - 1
+        if text is not None:
+            self.set_text(text, index)
+        return index
+
+    def set_text(self, val, index=0):
+        entry = self._text[index]
+        string = str(val)
+        if entry["maxlen"] and len(string) > entry["maxlen"]:
+            string = string[: entry["maxlen"] - 3] + "..."
+        if entry["label"] is None:
+            if not string:
+                return
+            x, y = entry["position"]
+            entry["label"] = Label(
+                self._load_font(entry["font"]), text=string, color=entry["color"],
+                scale=entry["scale"], x=x, y=y,
+            )
+            self.splash.append(entry["label"])
+        else:
+            entry["label"].text = string
+
+    def set_text_color(self, color, index=0):
+        self._text[index]["color"] = color
+        if self._text[index]["label"] is not None:
+            self._text[index]["label"].color = color
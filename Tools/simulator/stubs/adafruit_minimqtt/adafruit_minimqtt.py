@@ -0,0 +1,71 @@
+"""Stand-in for adafruit_minimqtt: a client of the in-process broker stub (state.broker)."""
+
+import collections
+
+from simulator import state
+
+
+class MMQTTException(Exception):
+    pass
+
+
+class MQTT:
+    def __init__(
+        self, *, broker, port=None, username=None, password=None, client_id=None, is_ssl=None,
+        keep_alive=60, socket_timeout=1, connect_retries=5, socket_pool=None, ssl_context=None, **kwargs
+    ):
+        if socket_timeout <= 0:
+            raise MMQTTException("socket_timeout must be > 0")
+        self.broker = broker
+        self.port = port
+        self._username = username
+        self._password = password
+        self.client_id = client_id
+        self._socket_timeout = socket_timeout
+        self._queue = collections.deque()  # (topic, message) appended by the broker thread
+        self._connected = False
+        self.on_message = None
+
+    def connect(self, clean_session=True, host=None, port=None, keep_alive=None):
+        if state.broker is None:
+            raise MMQTTException(f"Repeated connect failures to {self.broker}")
+        error = state.broker.connect(self, self._username, self._password)
+        if error:
+            raise MMQTTException(error)
+        self._connected = True
+
+    def subscribe(self, topic, qos=0):
+        topics = topic if isinstance(topic, list) else [(topic, qos)]
+        if not self._connected:
+            raise MMQTTException("MiniMQTT is not connected")
+        for name, _ in topics:
+            state.broker.subscribe(self, name)
+
+    def loop(self, timeout=0):
+        if timeout < self._socket_timeout:
+            raise MMQTTException("loop timeout must be >= socket timeout")
+        if not self._connected:
+            raise MMQTTException("MiniMQTT is not connected")
+        delivered = []
+        while self._queue:
+            topic, message = self._queue.popleft()
+            delivered.append(topic)
+            if self.on_message is not None:
+                self.on_message(self, topic, message)
+        return delivered or None
+
+    def is_connected(self):
+        return self._connected
+
+    def disconnect(self):
+        if not self._connected:
+            raise MMQTTException("MiniMQTT is not connected")
+        self._connected = False
+        state.broker.disconnect(self)
+
+    # Called by the broker stub
+    def _deliver(self, topic, message):
+        self._queue.append((topic, message))
+
+    def _drop(self):
+        self._connected = False
@@ -0,0 +1,36 @@
+"""Stand-in for adafruit_miniqr: a deterministic 25x25 pattern, not a scannable code."""
+
+import hashlib
+
+
+class _Matrix:
+    def __init__(self, size, cells):
+        self.width = size
+        self.height = size
+        self._cells = cells
+
+    def __getitem__(self, xy):
+        x, y = xy
+        return self._cells[y * self.width + x]
+
+
+class QRCode:
+    SIZE = 25  # Version 2
+
+    def __init__(self, *, qr_type=None, error_correct=None):
+        self._data = b""
+        self.matrix = None
+
+    def add_data(self, data):
+        self._data += data
+
+    def make(self, *, test=False, mask_pattern=0):
+        size = self.SIZE
+        digest = hashlib.sha256(self._data).digest() * 3
+        cells = [bool(digest[i // 8] >> (i % 8) & 1) for i in range(size * size)]
+        for ox, oy in ((0, 0), (size - 7, 0), (0, size - 7)):
+            for y in range(7):
+                for x in range(7):
+                    ring = min(x, y, 6 - x, 6 - y)
+                    cells[(oy + y) * size + ox + x] = ring != 1
+        self.matrix = _Matrix(size, cells)
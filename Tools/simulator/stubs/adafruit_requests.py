@@ -0,0 +1,102 @@
+"""Stand-in for adafruit_requests over the simulator's connection manager."""
+
+import json as json_module
+
+import adafruit_connection_manager
+
+
+class Response:
+    def __init__(self, sock, http_response):
+        self.socket = sock
+        self._response = http_response
+        self.status_code = http_response.status
+        self.reason = http_response.reason
+        self.headers = {k.lower(): v for k, v in http_response.getheaders()}
+        self._cached = None
+
+    def _readinto(self, buf):
+        return self._response.readinto(memoryview(buf))
+
+    @property
+    def content(self):
+        if self._cached is None:
+            self._cached = self._response.read()
+        return self._cached
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json_module.loads(self.content)
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        while True:
+            chunk = self._response.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        # Drain the rest so the keep-alive connection can carry the next request
+        self._response.read()
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Session:
+    def __init__(self, socket_pool, ssl_context=None, session_id=None):
+        self._connection_manager = adafruit_connection_manager.get_connection_manager(socket_pool)
+        self._ssl_context = ssl_context
+        self._session_id = session_id
+
+    @staticmethod
+    def _split(url):
+        proto, _, rest = url.partition("://")
+        host, _, path = rest.partition("/")
+        port = 443 if proto == "https" else 80
+        if ":" in host:
+            host, port = host.split(":", 1)
+            port = int(port)
+        return proto, host, port, "/" + path
+
+    def request(self, method, url, data=None, json=None, headers=None, stream=False, timeout=60):
+        proto, host, port, path = self._split(url)
+        headers = dict(headers or {})
+        if json is not None:
+            data = json_module.dumps(json)
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(data, str):
+            data = data.encode()
+        headers["Host"] = host
+        sock = self._connection_manager.get_socket(
+            host, port, proto + ":", session_id=self._session_id, timeout=timeout,
+            is_ssl=proto == "https", ssl_context=self._ssl_context,
+        )
+        sock.settimeout(timeout)
+        # The stub serves every host; the host goes in front of the path
+        stub_path = f"/{host}{path}"
+        try:
+            sock.connection.request(method, stub_path, body=data, headers=headers)
+            response = sock.connection.getresponse()
+        except OSError:
+            self._connection_manager.close_socket(sock)
+            raise
+        return Response(sock, response)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
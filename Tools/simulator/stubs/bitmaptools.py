@@ -0,0 +1,41 @@
+"""Stand-in for the bitmaptools functions the firmware uses: readinto and blit."""
+
+
+def readinto(bitmap, file, bits_per_pixel, element_size=1, reverse_pixels_in_element=False, swap_bytes_in_element=False, reverse_rows=False):
+    """Fill bitmap from file; rows are padded to whole elements, pixels LSB-first unless reversed."""
+    if element_size != 1 or bits_per_pixel not in (1, 2, 4, 8):
+        raise NotImplementedError("the simulator reads 1/2/4/8-bit pixels in 1-byte elements only")
+    per_byte = 8 // bits_per_pixel
+    mask = (1 << bits_per_pixel) - 1
+    row_bytes = (bitmap.width * bits_per_pixel + 7) // 8
+    for row in range(bitmap.height):
+        data = file.read(row_bytes)
+        if len(data) < row_bytes:
+            raise EOFError("unexpected end of file")
+        y = bitmap.height - 1 - row if reverse_rows else row
+        for x in range(bitmap.width):
+            slot = x % per_byte
+            if reverse_pixels_in_element:
+                slot = per_byte - 1 - slot
+            bitmap[x, y] = (data[x // per_byte] >> (slot * bits_per_pixel)) & mask
+
+
+def blit(dest_bitmap, source_bitmap, x, y, *, x1=0, y1=0, x2=None, y2=None, skip_source_index=None, skip_dest_index=None):
+    if x2 is None:
+        x2 = source_bitmap.width
+    if y2 is None:
+        y2 = source_bitmap.height
+    for sy in range(y1, y2):
+        dy = y + sy - y1
+        if not 0 <= dy < dest_bitmap.height:
+            continue
+        for sx in range(x1, x2):
+            dx = x + sx - x1
+            if not 0 <= dx < dest_bitmap.width:
+                continue
+            value = source_bitmap[sx, sy]
+            if value == skip_source_index:
+                continue
+            if skip_dest_index is not None and dest_bitmap[dx, dy] == skip_dest_index:
+                continue
+            dest_bitmap[dx, dy] = value
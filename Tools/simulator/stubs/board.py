@@ -0,0 +1,5 @@
+"""Stand-in for the MatrixPortal S3 board module: pin names only."""
+
+NEOPIXEL = "NEOPIXEL"
+BUTTON_UP = "BUTTON_UP"
+BUTTON_DOWN = "BUTTON_DOWN"
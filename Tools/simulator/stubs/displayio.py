@@ -0,0 +1,133 @@
+"""Stand-in for displayio: Bitmap, Palette, TileGrid and Group, composed by framebufferio."""
+
+
+class Bitmap:
+    def __init__(self, width, height, value_count):
+        if value_count < 1 or value_count > 65536:
+            raise ValueError("value_count must be 1..65536")
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self._data = bytearray(width * height) if value_count <= 256 else [0] * (width * height)
+
+    def _offset(self, index):
+        if isinstance(index, tuple):
+            x, y = index
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise IndexError("pixel coordinates out of bounds")
+            return y * self.width + x
+        return index
+
+    def __getitem__(self, index):
+        return self._data[self._offset(index)]
+
+    def __setitem__(self, index, value):
+        if value >= self.value_count:
+            raise ValueError("pixel value out of range")
+        self._data[self._offset(index)] = value
+
+    def fill(self, value):
+        if isinstance(self._data, bytearray):
+            self._data[:] = bytes((value,)) * len(self._data)
+        else:
+            self._data[:] = [value] * len(self._data)
+
+    def dirty(self, x1=0, y1=0, x2=-1, y2=-1):
+        pass
+
+
+class Palette:
+    def __init__(self, color_count, *, dither=False):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        if isinstance(color, (tuple, list)):
+            color = (color[0] << 16) | (color[1] << 8) | color[2]
+        elif isinstance(color, (bytes, bytearray)):
+            color = (color[0] << 16) | (color[1] << 8) | color[2]
+        self._colors[index] = color & 0xFFFFFF
+
+    def make_transparent(self, index):
+        self._transparent[index] = True
+
+    def make_opaque(self, index):
+        self._transparent[index] = False
+
+    def is_transparent(self, index):
+        return self._transparent[index]
+
+
+class ColorConverter:
+    def convert(self, color):
+        return color
+
+
+class TileGrid:
+    """Single-tile TileGrid, which is all the firmware uses."""
+
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1, tile_width=None, tile_height=None, default_tile=0, x=0, y=0):
+        if width != 1 or height != 1:
+            raise NotImplementedError("the simulator supports single-tile TileGrids only")
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+    @property
+    def width(self):
+        return 1
+
+    @property
+    def height(self):
+        return 1
+
+
+class Group:
+    def __init__(self, *, scale=1, x=0, y=0):
+        self.scale = scale
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self._items = []
+
+    def append(self, layer):
+        self._items.append(layer)
+
+    def insert(self, index, layer):
+        self._items.insert(index, layer)
+
+    def remove(self, layer):
+        self._items.remove(layer)
+
+    def pop(self, i=-1):
+        return self._items.pop(i)
+
+    def index(self, layer):
+        return self._items.index(layer)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, layer):
+        self._items[index] = layer
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, layer):
+        return layer in self._items
+
+
+def release_displays():
+    pass
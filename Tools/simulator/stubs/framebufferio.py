@@ -0,0 +1,91 @@
+"""Stand-in for framebufferio: a 64x32 RGB framebuffer composed on refresh()."""
+
+import time
+from collections import deque
+
+from simulator import state
+
+_ASCII_RAMP = " .:-=+*#%@"
+
+
+class FramebufferDisplay:
+    def __init__(self, framebuffer=None, *, width=64, height=32, rotation=0, auto_refresh=True):
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.auto_refresh = auto_refresh
+        self.root_group = None
+        self.brightness = 1.0
+        self.pixels = [0] * (width * height)  # 0xRRGGBB per pixel, row-major
+        self.frames = 0
+        self.last_refresh = None
+        self.refresh_times = deque(maxlen=10000)  # monotonic time of recent refreshes, for frame pacing
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        self.compose()
+        now = time.monotonic()
+        self.frames += 1
+        self.last_refresh = now
+        self.refresh_times.append(now)
+        for hook in state.refresh_hooks:
+            hook(self)
+        return True
+
+    def compose(self):
+        pixels = self.pixels
+        for i in range(len(pixels)):
+            pixels[i] = 0
+        if self.root_group is not None:
+            self._draw_group(self.root_group, 0, 0)
+
+    def _draw_group(self, group, ox, oy):
+        if group.hidden:
+            return
+        ox += group.x
+        oy += group.y
+        for layer in group:
+            if hasattr(layer, "bitmap"):
+                self._draw_tile_grid(layer, ox, oy)
+            else:
+                self._draw_group(layer, ox, oy)
+
+    def _draw_tile_grid(self, grid, ox, oy):
+        if grid.hidden:
+            return
+        bitmap = grid.bitmap
+        palette = grid.pixel_shader
+        left = ox + grid.x
+        top = oy + grid.y
+        x_start = max(left, 0)
+        x_end = min(left + bitmap.width, self.width)
+        y_start = max(top, 0)
+        y_end = min(top + bitmap.height, self.height)
+        for y in range(y_start, y_end):
+            row = y * self.width
+            for x in range(x_start, x_end):
+                value = bitmap[x - left, y - top]
+                if palette.is_transparent(value):
+                    continue
+                self.pixels[row + x] = palette[value]
+
+    def ascii(self):
+        """The framebuffer as text, one character per LED by brightness."""
+        lines = []
+        for y in range(self.height):
+            line = []
+            for x in range(self.width):
+                color = self.pixels[y * self.width + x]
+                level = max((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+                line.append(_ASCII_RAMP[level * (len(_ASCII_RAMP) - 1) // 255])
+            lines.append("".join(line).rstrip())
+        return "\n".join(lines)
+
+    def write_ppm(self, path, scale=8):
+        with open(path, "wb") as f:
+            f.write(f"P6 {self.width * scale} {self.height * scale} 255\n".encode())
+            for y in range(self.height):
+                row = bytearray()
+                for x in range(self.width):
+                    color = self.pixels[y * self.width + x]
+                    row += bytes(((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)) * scale
+                f.write(bytes(row) * scale)
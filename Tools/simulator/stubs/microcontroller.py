@@ -0,0 +1,41 @@
+"""Stand-in for microcontroller: file-backed NVM and resets the runner handles."""
+
+import os
+
+from simulator import state
+
+
+class _NVM(bytearray):
+    """bytearray that writes itself back to state.nvm_path on every store."""
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        if len(self) != state.nvm_size:
+            raise ValueError("NVM slice assignment must keep the size")
+        with open(state.nvm_path, "wb") as f:
+            f.write(self)
+
+
+def _load_nvm():
+    data = b""
+    if state.nvm_path and os.path.exists(state.nvm_path):
+        with open(state.nvm_path, "rb") as f:
+            data = f.read(state.nvm_size)
+    return _NVM(data.ljust(state.nvm_size, b"\0"))
+
+
+nvm = _load_nvm()
+
+
+class _CPU:
+    frequency = 240_000_000
+    temperature = 40.0
+    voltage = 3.3
+    reset_reason = "SOFTWARE"
+
+
+cpu = _CPU()
+
+
+def reset():
+    raise state.SimulatedReset()
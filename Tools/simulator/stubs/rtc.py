@@ -0,0 +1,13 @@
+"""Stand-in for rtc: the host clock is already right, so setting it is a no-op."""
+
+import time
+
+
+class RTC:
+    @property
+    def datetime(self):
+        return time.localtime()
+
+    @datetime.setter
+    def datetime(self, value):
+        pass
@@ -0,0 +1,24 @@
+"""Stand-in for socketpool: name lookups resolve to the local API stub."""
+
+from simulator import state
+
+AF_INET = 2
+SOCK_STREAM = 1
+SOCK_DGRAM = 2
+IPPROTO_TCP = 6
+
+
+class SocketPool:
+    AF_INET = AF_INET
+    SOCK_STREAM = SOCK_STREAM
+    SOCK_DGRAM = SOCK_DGRAM
+    IPPROTO_TCP = IPPROTO_TCP
+
+    def __init__(self, radio):
+        self.radio = radio
+        self.lookups = 0
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        self.lookups += 1
+        state.dns_lookups += 1
+        return [(AF_INET, SOCK_STREAM, IPPROTO_TCP, "", (state.api_host, port))]
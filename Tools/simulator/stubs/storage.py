@@ -0,0 +1,21 @@
+"""Stand-in for storage: tracks USB visibility and the read-only flag of the drive."""
+
+from simulator import state
+
+
+def disable_usb_drive():
+    if not state.in_boot_py:
+        raise RuntimeError("Cannot change USB devices now")
+    state.usb_drive_enabled = False
+
+
+def enable_usb_drive():
+    if not state.in_boot_py:
+        raise RuntimeError("Cannot change USB devices now")
+    state.usb_drive_enabled = True
+
+
+def remount(mount_path, readonly=False, *, disable_concurrent_write_protection=False):
+    if not readonly and state.usb_drive_enabled and not state.in_boot_py:
+        raise RuntimeError("Cannot remount '/' when visible via USB.")
+    state.readonly = readonly
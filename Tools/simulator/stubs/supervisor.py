@@ -0,0 +1,10 @@
+"""Stand-in for supervisor: ticks_ms() wraps at 2**29 like CircuitPython's."""
+
+import time
+
+_TICKS_PERIOD = 1 << 29
+_started = time.monotonic()
+
+
+def ticks_ms():
+    return int((time.monotonic() - _started) * 1000) % _TICKS_PERIOD
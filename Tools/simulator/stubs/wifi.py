@@ -0,0 +1,44 @@
+"""Stand-in for wifi: one access point, joined quickly by BSSID and slowly by scanning."""
+
+import time
+from collections import namedtuple
+
+from simulator import state
+
+Network = namedtuple("Network", ("ssid", "bssid", "rssi", "channel"))
+
+
+class _Radio:
+    enabled = True
+    hostname = "blocktron-sim"
+    mac_address = bytes.fromhex("f412fa000001")
+    ipv4_address = "192.168.4.20"
+    ipv4_gateway = "192.168.4.1"
+    ipv4_dns = "192.168.4.1"
+
+    @property
+    def connected(self):
+        return state.wifi_connected
+
+    @property
+    def ap_info(self):
+        if not state.wifi_connected:
+            return None
+        return Network(state.wifi_ssid, state.wifi_bssid, state.wifi_rssi, state.wifi_channel)
+
+    def connect(self, ssid=None, password=None, *, channel=0, bssid=None, timeout=None):
+        if bssid is not None and (bytes(bssid) != state.wifi_bssid or channel not in (0, state.wifi_channel)):
+            time.sleep(timeout or 1)
+            raise ConnectionError("No network with that ssid")
+        if bssid is None:
+            state.wifi_scans += 1
+            time.sleep(state.wifi_scan_seconds)
+        time.sleep(state.wifi_join_seconds)
+        state.wifi_joins += 1
+        state.wifi_connected = True
+
+    def ping(self, ip, *, timeout=0.5):
+        return 0.004 if state.gateway_reachable and state.wifi_connected else None
+
+
+radio = _Radio()